@@ -0,0 +1,171 @@
+"""Пропускная способность базы при одновременных чтении и записи.
+
+Запуск из корня репозитория:
+
+    python benchmarks/concurrent_db.py --readers 8 --writers 2 --seconds 10
+
+Каждый профиль настроек запускается в отдельном процессе на свежей
+базе. Потоки-читатели открывают ленту, потоки-писатели добавляют
+комментарии; между операциями отрабатывают сигналы начала и конца
+запроса, так что CONN_MAX_AGE и проверка соединений ведут себя как на
+сервере. Для SQLite сравниваются журнал по умолчанию и WAL с PRAGMA из
+настроек, для PostgreSQL (DJANGO_DB_ENGINE=postgresql, пустая база) —
+соединение на запрос и постоянные соединения.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import seed, setup_django
+
+PROFILES = {
+    'sqlite': {
+        'sqlite-default': {
+            'DJANGO_SQLITE_JOURNAL_MODE': 'delete',
+            'DJANGO_SQLITE_SYNCHRONOUS': 'full',
+            'DJANGO_DB_CONN_MAX_AGE': '0',
+        },
+        'sqlite-wal': {
+            'DJANGO_SQLITE_JOURNAL_MODE': 'wal',
+            'DJANGO_SQLITE_SYNCHRONOUS': 'normal',
+            'DJANGO_DB_CONN_MAX_AGE': '60',
+        },
+    },
+    'postgresql': {
+        'pg-per-request': {'DJANGO_DB_CONN_MAX_AGE': '0'},
+        'pg-persistent': {'DJANGO_DB_CONN_MAX_AGE': '60'},
+    },
+}
+
+
+def request_cycle(operation):
+    """Операция в обрамлении сигналов запроса, как в обработчике Django"""
+    from django.core import signals
+
+    signals.request_started.send(sender=None)
+    try:
+        operation()
+    finally:
+        signals.request_finished.send(sender=None)
+
+
+def run_workload(readers, writers, seconds):
+    from django.db import OperationalError, connections, transaction
+
+    from blog.models import Comment, Post
+
+    author_id = Post.objects.values_list('author_id', flat=True).first()
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:100])
+    stop = threading.Event()
+    results = {'read': [], 'write': []}
+    lock = threading.Lock()
+
+    def read():
+        list(Post.objects.main_filter()[:10])
+
+    def write():
+        post_id = post_ids[time.perf_counter_ns() % len(post_ids)]
+        with transaction.atomic():
+            Comment.objects.create(
+                text='Комментарий', author_id=author_id, post_id=post_id
+            )
+            Post.objects.filter(pk=post_id).update_comment_count(1)
+
+    def worker(kind, operation):
+        done = errors = 0
+        timings = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                request_cycle(operation)
+            except OperationalError:
+                errors += 1
+                continue
+            timings.append(time.perf_counter() - started)
+            done += 1
+        connections.close_all()
+        with lock:
+            results[kind].append((done, errors, timings))
+
+    threads = [
+        threading.Thread(target=worker, args=('read', read))
+        for _ in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=('write', write))
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    report = {}
+    for kind, rows in results.items():
+        timings = sorted(t for _, _, row in rows for t in row)
+        done = sum(row[0] for row in rows)
+        report[kind] = {
+            'ops_per_s': round(done / seconds, 1),
+            'errors': sum(row[1] for row in rows),
+            'p50_ms': round(timings[len(timings) // 2] * 1000, 3)
+            if timings else None,
+            'p99_ms': round(
+                timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+                * 1000, 3
+            ) if timings else None,
+        }
+    return report
+
+
+def run_profile(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        seed(posts=args.posts, comments=args.posts)
+        report = run_workload(args.readers, args.writers, args.seconds)
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--profile', help=argparse.SUPPRESS)
+    parser.add_argument('--json', type=Path, help='Куда сохранить отчёт.')
+    args = parser.parse_args()
+    if args.profile:
+        return run_profile(args)
+
+    engine = os.getenv('DJANGO_DB_ENGINE', 'sqlite')
+    report = {}
+    for name, env in PROFILES[engine].items():
+        completed = subprocess.run(
+            [sys.executable, __file__, '--profile', name,
+             '--readers', str(args.readers), '--writers', str(args.writers),
+             '--seconds', str(args.seconds), '--posts', str(args.posts)],
+            env={**os.environ, **env}, capture_output=True, text=True,
+            check=True
+        )
+        report[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f'{"профиль":<18}{"операция":<10}{"оп/с":>10}{"p50 мс":>10}'
+          f'{"p99 мс":>10}{"ошибок":>8}')
+    for name, result in report.items():
+        for kind, row in result.items():
+            print(f'{name:<18}{kind:<10}{row["ops_per_s"]:>10}'
+                  f'{row["p50_ms"]!s:>10}{row["p99_ms"]!s:>10}'
+                  f'{row["errors"]:>8}')
+    if args.json:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
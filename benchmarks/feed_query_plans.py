@@ -0,0 +1,103 @@
+"""Планы и время запросов лент до и после индексов Post.Meta.indexes.
+
+Запуск из корня репозитория:
+
+    python benchmarks/feed_query_plans.py --posts 200000 --json plans.json
+
+База создаётся во временном каталоге и удаляется после прогона.
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from common import seed, setup_django
+
+
+def feed_querysets():
+    """Запросы, которые выполняют ленты при открытии первой страницы."""
+    from blog.models import Category, Post, User
+
+    category = Category.objects.filter(is_published=True).first()
+    author = User.objects.first()
+    return {
+        'IndexListView': Post.objects.main_filter(),
+        'CategoryPostsListView': Post.objects.main_filter().filter(
+            category=category
+        ),
+        'ProfileDetailView (гость)': Post.objects.main_filter().filter(
+            author=author
+        ),
+        'ProfileDetailView (автор)': Post.objects.filter(
+            author=author
+        ).select_related(
+            'author', 'category', 'location'
+        ).order_by('-pub_date'),
+    }
+
+
+def measure(querysets, per_page, repeat):
+    result = {}
+    for name, queryset in querysets.items():
+        page = queryset[:per_page]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(page.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        result[name] = {
+            'plan': page.explain().splitlines(),
+            'median_ms': round(statistics.median(timings), 3),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--per-page', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', type=Path, help='Куда сохранить отчёт.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        from django.db import connection
+
+        from blog.models import Post
+
+        seed(
+            users=args.users, categories=args.categories, posts=args.posts,
+            comments=0
+        )
+        indexes = Post._meta.indexes
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Post, index)
+        connection.cursor().execute('ANALYZE')
+        before = measure(feed_querysets(), args.per_page, args.repeat)
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Post, index)
+        connection.cursor().execute('ANALYZE')
+        after = measure(feed_querysets(), args.per_page, args.repeat)
+
+    report = {'posts': args.posts, 'before': before, 'after': after}
+    for name in before:
+        print(f'== {name}')
+        for label, data in (('до', before), ('после', after)):
+            print(f'  {label}: {data[name]["median_ms"]} мс')
+            for line in data[name]['plan']:
+                print(f'    {line}')
+    if args.json:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
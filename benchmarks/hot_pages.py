@@ -0,0 +1,196 @@
+"""Бенчмарк горячих страниц блога через тестовый клиент Django.
+
+Запуск из корня репозитория:
+
+    python benchmarks/hot_pages.py --posts 50000 --json report.json
+    python benchmarks/hot_pages.py --posts 50000 --baseline report.json
+
+Для каждого сценария в отчёт попадают число запросов, пропускная
+способность, p50/p99/среднее время ответа и число SQL-запросов.
+С --baseline рядом печатается изменение относительно прошлого отчёта.
+"""
+import argparse
+import json
+import platform
+import statistics
+import tempfile
+import time
+from itertools import count
+from pathlib import Path
+
+from common import seed, setup_django
+
+HOST = 'localhost'
+
+
+def build_scenarios():
+    """Сценарий: (название, клиент, метод, функция url, данные)"""
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    from blog.models import Category, Post
+
+    User = get_user_model()
+    reader = User.objects.order_by('pk').first()
+    category = Category.objects.filter(is_published=True).first()
+    post = Post.objects.main_filter().order_by('-comment_count').first()
+    total_posts = Post.objects.main_filter().count()
+    deep_page = max(total_posts // 10 // 2, 1)
+
+    guest = Client(HTTP_HOST=HOST)
+    member = Client(HTTP_HOST=HOST)
+    member.force_login(reader)
+
+    titles = count()
+
+    def new_post():
+        return {
+            'title': f'Новый пост {next(titles)}',
+            'text': 'Текст нового поста',
+            'pub_date': '2020-01-01T00:00',
+            'category': category.pk,
+        }
+
+    def constant(url):
+        return lambda: url
+
+    return [
+        ('index (guest)', guest, 'get', constant('/'), None),
+        ('index (member)', member, 'get', constant('/'), None),
+        (
+            'index deep page (member)', member, 'get',
+            constant(f'/?page={deep_page}'), None
+        ),
+        (
+            'category (member)', member, 'get',
+            constant(f'/category/{category.slug}/'), None
+        ),
+        (
+            'profile (member)', member, 'get',
+            constant(f'/profile/{post.author.username}/'), None
+        ),
+        (
+            'detail (member)', member, 'get',
+            constant(f'/posts/{post.pk}/'), None
+        ),
+        (
+            'comment create', member, 'post',
+            constant(f'/posts/{post.pk}/comment/'),
+            lambda: {'text': 'Комментарий'}
+        ),
+        (
+            'post create', member, 'post',
+            constant('/posts/create/'), new_post
+        ),
+    ]
+
+
+def run_scenario(client, method, url, data, requests, warmup):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    send = getattr(client, method)
+
+    def call():
+        payload = data() if data else None
+        return send(url(), payload) if payload else send(url())
+
+    for _ in range(warmup):
+        call()
+    timings = []
+    queries = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = call()
+            timings.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{url()} -> {response.status_code}')
+        queries.append(len(captured))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        'requests': requests,
+        'rps': round(requests / elapsed, 2),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'p50_ms': round(timings[int(len(timings) * 0.5)] * 1000, 3),
+        'p99_ms': round(
+            timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3
+        ),
+        'queries': round(statistics.mean(queries), 2),
+    }
+
+
+def print_report(report, baseline=None):
+    baseline = (baseline or {}).get('scenarios', {})
+    header = f'{"сценарий":<28}{"rps":>10}{"p50 мс":>10}{"p99 мс":>10}'
+    print(header + f'{"запросов":>10}')
+    for name, result in report['scenarios'].items():
+        line = (
+            f'{name:<28}{result["rps"]:>10}{result["p50_ms"]:>10}'
+            f'{result["p99_ms"]:>10}{result["queries"]:>10}'
+        )
+        old = baseline.get(name)
+        if old:
+            change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100
+            line += f'   p50 {change:+.1f}%, запросов {old["queries"]}'
+            line += f' -> {result["queries"]}'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--locations', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', type=Path, help='Куда сохранить отчёт.')
+    parser.add_argument(
+        '--baseline', type=Path, help='Отчёт прошлого прогона для сравнения.'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(Path(tmp) / 'bench.sqlite3')
+        import django
+
+        seed(
+            users=args.users, categories=args.categories,
+            locations=args.locations, posts=args.posts,
+            comments=args.comments, rng_seed=args.seed
+        )
+        scenarios = {}
+        for name, client, method, url, data in build_scenarios():
+            scenarios[name] = run_scenario(
+                client, method, url, data, args.requests, args.warmup
+            )
+
+    report = {
+        'params': {
+            key: getattr(args, key) for key in (
+                'users', 'categories', 'locations', 'posts', 'comments',
+                'requests', 'warmup', 'seed'
+            )
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+        },
+        'scenarios': scenarios,
+    }
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+    print_report(report, baseline)
+    if args.json:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
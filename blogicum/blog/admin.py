@@ -1,8 +1,18 @@
-from django.contrib import admin
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin, messages
 from .models import Post, Category, Location, User, Comment
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Q
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import Truncator
+from .images import reset_renditions, schedule_renditions
+from .paginators import EstimatedCountPaginator
+from .publishing import set_published, set_published_in_background
+from .search import search_posts
 
 
 class MainAdmin(admin.ModelAdmin):
@@ -14,12 +24,31 @@ class MainAdmin(admin.ModelAdmin):
     actions = ['on_published', 'off_published']  # Действие
 
     @admin.action(description="Опубликовать")
-    def on_published(self, modeladmin, request, queryset):
-        queryset.update(is_published=True)
+    def on_published(self, request, queryset):
+        self.set_published(request, queryset, True)
 
     @admin.action(description="Снять с публикации")
-    def off_published(self, modeladmin, request, queryset):
-        queryset.update(is_published=False)
+    def off_published(self, request, queryset):
+        self.set_published(request, queryset, False)
+
+    def set_published(self, request, queryset, value):
+        """Меняет публикацию пачками, большие выборки — в фоне"""
+        if queryset[:settings.BLOG_PUBLISH_SYNC_LIMIT + 1].count() > (
+            settings.BLOG_PUBLISH_SYNC_LIMIT
+        ):
+            set_published_in_background(queryset, value, request.user.pk)
+            self.message_user(
+                request,
+                'Выборка большая: изменения применяются в фоне пачками '
+                f'по {settings.BLOG_PUBLISH_BATCH_SIZE}, ход виден в '
+                'журнале действий.',
+                messages.INFO
+            )
+            return
+        done = set_published(queryset, value, request.user.pk)
+        self.message_user(
+            request, f'Изменено объектов: {done}.', messages.SUCCESS
+        )
 
 
 class LocationAdmin(MainAdmin):
@@ -66,6 +95,24 @@ class PostAdmin(MainAdmin):
         'category',
     )
     list_filter = ('is_published', MyFilter)
+    list_select_related = ('category',)
+    autocomplete_fields = ('author', 'category', 'location')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск через полнотекстовый индекс вместо icontains
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            reset_renditions(obj)
+        super().save_model(request, obj, form, change)
+        if image_changed:
+            schedule_renditions(obj)
 
 
 class CategoryAdmin(MainAdmin):
@@ -79,9 +126,22 @@ class CategoryAdmin(MainAdmin):
 class UserCommentsAdmin(admin.ModelAdmin):
     list_display = (
         'id',
-        'text',
+        'short_text',
+        'post',
+        'author',
         'is_published',
     )
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    # Точные совпадения идут по индексам, без LIKE по тексту
+    search_fields = ('=post__id', '=author__username')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Текст коментария')
+    def short_text(self, obj):
+        return Truncator(obj.text).chars(80)
 
 
 admin.site.register(Post, PostAdmin)
@@ -90,10 +150,101 @@ admin.site.register(Location, LocationAdmin)
 admin.site.register(Comment, UserCommentsAdmin)
 
 
+def count_by_author(model):
+    """Число объектов model у пользователя — подзапрос по индексу author"""
+    return Coalesce(Subquery(
+        model.objects.filter(author=OuterRef('pk')).order_by().values(
+            'author'
+        ).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+class HasPostsFilter(admin.SimpleListFilter):
+    title = _('Есть посты')
+    parameter_name = 'has_posts'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('yes', _('Да')),
+            ('no', _('Нет')),
+        )
+
+    def queryset(self, request, queryset):
+        has_posts = Exists(Post.objects.filter(author=OuterRef('pk')))
+        if self.value() == 'yes':
+            return queryset.filter(has_posts)
+        if self.value() == 'no':
+            return queryset.filter(~has_posts)
+        return queryset
+
+
+class PostCountFilter(admin.SimpleListFilter):
+    title = _('Количество постов')
+    parameter_name = 'post_count'
+    buckets = {
+        '1-9': (1, 9),
+        '10-99': (10, 99),
+        '100+': (100, None),
+    }
+
+    def lookups(self, request, model_admin):
+        return [(key, key) for key in self.buckets]
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.buckets:
+            return queryset
+        low, high = self.buckets[self.value()]
+        queryset = queryset.filter(post_count__gte=low)
+        if high is not None:
+            queryset = queryset.filter(post_count__lte=high)
+        return queryset
+
+
+class RecentActivityFilter(admin.SimpleListFilter):
+    title = _('Активность')
+    parameter_name = 'active_within'
+    periods = {'7': _('Писали за 7 дней'), '30': _('Писали за 30 дней')}
+
+    def lookups(self, request, model_admin):
+        return list(self.periods.items())
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.periods:
+            return queryset
+        since = timezone.now() - timedelta(days=int(self.value()))
+        return queryset.filter(
+            Exists(Post.objects.filter(
+                author=OuterRef('pk'), created_at__gte=since
+            ))
+            | Exists(Comment.objects.filter(
+                author=OuterRef('pk'), created_at__gte=since
+            ))
+        )
+
+
 # Регистрация модели User с вашим настроенным UserAdmin
 class ListUsers(UserAdmin):
-    list_display = ('username', 'email', 'is_staff')
-    list_filter = ('posts__title',)
+    list_display = (
+        'username', 'email', 'is_staff', 'post_count', 'comment_count'
+    )
+    list_filter = (
+        'is_staff', HasPostsFilter, PostCountFilter, RecentActivityFilter
+    )
+
+    def get_queryset(self, request):
+        # Счётчики — коррелированные подзапросы, без JOIN и GROUP BY
+        return super().get_queryset(request).annotate(
+            post_count=count_by_author(Post),
+            comment_count=count_by_author(Comment),
+        )
+
+    @admin.display(description='Постов', ordering='post_count')
+    def post_count(self, obj):
+        return obj.post_count
+
+    @admin.display(description='Комментариев', ordering='comment_count')
+    def comment_count(self, obj):
+        return obj.comment_count
 
 
 admin.site.unregister(User)
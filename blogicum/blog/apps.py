@@ -1,7 +1,25 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import apply_sqlite_pragmas, mark_persistent_connections
+        post_migrate.connect(repair_search_index, sender=self)
+        connection_created.connect(apply_sqlite_pragmas)
+        request_started.connect(mark_persistent_connections)
+
+
+def repair_search_index(using, **kwargs):
+    """Возвращает триггеры поиска после перестройки таблицы постов"""
+    from django.db import connections
+
+    from .search import repair
+    repair(connections[using])
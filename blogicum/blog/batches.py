@@ -0,0 +1,34 @@
+"""Обход больших выборок постов пачками по pk.
+
+Каждая пачка — отдельная транзакция, поэтому пересчёт по всей таблице
+не держит блокировку записи до конца обхода.
+"""
+from django.db import transaction
+
+
+def batched(queryset, method, batch_size, on_batch=None):
+    """Вызывает метод queryset (имя method) для пачек по batch_size pk.
+
+    Метод возвращает число изменённых строк. Результат —
+    (просмотрено, изменено); on_batch(processed, changed) — после пачки.
+    """
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    processed = changed = 0
+    last_pk = None
+    while True:
+        batch = list(
+            (ids if last_pk is None else ids.filter(pk__gt=last_pk))[
+                :batch_size
+            ]
+        )
+        if not batch:
+            break
+        with transaction.atomic(using=queryset.db):
+            changed += getattr(
+                queryset.filter(pk__gte=batch[0], pk__lte=batch[-1]), method
+            )()
+        last_pk = batch[-1]
+        processed += len(batch)
+        if on_batch:
+            on_batch(processed, changed)
+    return processed, changed
@@ -0,0 +1,321 @@
+"""Потоковые загрузка и выгрузка постов и комментариев.
+
+Загрузка пишет объекты фикстур пачками через bulk_create, выгрузка
+отдаёт строки JSON Lines (в формате фикстур) или CSV по одной,
+читая базу через iterator(chunk_size=...).
+"""
+import csv
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from .models import Category, Comment, Location, Post, make_excerpt
+
+READ_CHUNK = 64 * 1024
+# Сколько pk затронутых постов пересчитывать одним запросом
+TOUCHED_CHUNK = 500
+
+User = get_user_model()
+
+# В порядке зависимостей: родители записываются раньше детей
+LOADABLE_MODELS = {
+    model._meta.label_lower: model
+    for model in (User, Category, Location, Post, Comment)
+}
+
+# Поля с auto_now/auto_now_add; на время загрузки флаги снимаются
+AUTO_TIMESTAMP_FIELDS = {
+    model: [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField)
+        and (field.auto_now or field.auto_now_add)
+    ]
+    for model in LOADABLE_MODELS.values()
+}
+
+
+def iter_fixture_objects(stream):
+    """Объекты фикстуры из JSON-массива или JSON Lines по одному.
+
+    Файл не читается целиком: массив разбирается по мере чтения
+    кусками через JSONDecoder.raw_decode.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(READ_CHUNK)
+    position = _skip_whitespace(buffer, 0)
+    if buffer[position:position + 1] != '[':
+        # JSON Lines
+        for line in _iter_lines(buffer[position:], stream):
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+        return
+    position += 1
+    while True:
+        position = _skip_whitespace(buffer, position, ',')
+        if buffer[position:position + 1] == ']':
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = stream.read(READ_CHUNK)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield obj
+        if end >= len(buffer) // 2:
+            buffer, position = buffer[end:], 0
+        else:
+            position = end
+
+
+def _skip_whitespace(buffer, position, extra=''):
+    while position < len(buffer) and (
+        buffer[position].isspace() or buffer[position] in extra
+    ):
+        position += 1
+    return position
+
+
+def _iter_lines(head, stream):
+    pending = head
+    while True:
+        *lines, pending = pending.split('\n')
+        yield from lines
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            yield pending
+            return
+        pending += chunk
+
+
+@contextmanager
+def keep_fixture_timestamps():
+    """Не даёт auto_now/auto_now_add перезаписать даты из фикстуры"""
+    saved = []
+    for fields in AUTO_TIMESTAMP_FIELDS.values():
+        for field in fields:
+            saved.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkLoader:
+    """Копит объекты фикстуры и пишет их пачками по batch_size.
+
+    Внешние ключи берутся как есть (pk сохраняются) либо разрешаются
+    по естественному ключу: ["username"] для пользователей,
+    ["slug"] для категорий.
+
+    После каждой пачки у затронутых ею постов пересчитываются счётчики
+    комментариев (если recount) и видимость; память не растёт с числом
+    строк. Оба пересчёта абсолютные, повтор для поста из нескольких
+    пачек безопасен.
+    """
+
+    def __init__(self, batch_size=5000, ignore_conflicts=False,
+                 on_flush=None, recount=True):
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.on_flush = on_flush
+        self.recount = recount
+        self.pending = {model: [] for model in LOADABLE_MODELS.values()}
+        self.loaded = {model: 0 for model in LOADABLE_MODELS.values()}
+        self.skipped = 0
+        # pk постов текущей пачки по методу пересчёта
+        self.touched = {
+            'recount_comments': set(), 'recompute_visibility': set()
+        }
+        self.touched_categories = set()
+        # Пересчёты по всей таблице: bulk_create не везде возвращает pk
+        self.full_pass = set()
+        self._natural_keys = {User: {}, Category: {}}
+
+    def add(self, record):
+        model = LOADABLE_MODELS.get(record.get('model', '').lower())
+        if model is None:
+            self.skipped += 1
+            return
+        self.pending[model].append(self.build(model, record))
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush()
+
+    def build(self, model, record):
+        values = {}
+        if record.get('pk') is not None:
+            values[model._meta.pk.attname] = record['pk']
+        for name, value in record.get('fields', {}).items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                continue
+            if field.is_relation:
+                values[field.attname] = self.resolve(
+                    field.related_model, value
+                )
+            else:
+                values[field.attname] = field.to_python(value)
+        obj = model(**values)
+        for field in AUTO_TIMESTAMP_FIELDS[model]:
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, timezone.now())
+        if model is Post and not obj.excerpt:
+            # bulk_create обходит save(), анонс строится здесь
+            obj.excerpt = make_excerpt(obj.text)
+        return obj
+
+    def resolve(self, related_model, value):
+        if not isinstance(value, list):
+            return value
+        cache = self._natural_keys.get(related_model)
+        if cache is None:
+            raise ValueError(
+                f'Нет естественного ключа для {related_model._meta.label}'
+            )
+        key = tuple(value)
+        if key not in cache:
+            lookup = {
+                'username' if related_model is User else 'slug': value[0]
+            }
+            pks = related_model.objects.values_list('pk', flat=True)
+            try:
+                cache[key] = pks.get(**lookup)
+            except related_model.DoesNotExist:
+                # Родитель мог прийти в этом же файле и ждать записи
+                self.flush()
+                cache[key] = pks.get(**lookup)
+        return cache[key]
+
+    def flush(self):
+        written = False
+        for model, objs in self.pending.items():
+            if not objs:
+                continue
+            model.objects.bulk_create(
+                objs, batch_size=self.batch_size,
+                ignore_conflicts=self.ignore_conflicts
+            )
+            self.loaded[model] += len(objs)
+            self.touch(model, objs)
+            objs.clear()
+            written = True
+        if written:
+            self.refresh()
+        if self.on_flush:
+            self.on_flush(self)
+
+    def finish(self):
+        """Дописывает остаток и делает отложенные полные пересчёты"""
+        self.flush()
+        for method in sorted(self.full_pass):
+            getattr(Post.objects.all(), method)()
+        self.full_pass.clear()
+
+    def touch(self, model, objs):
+        if model is Comment:
+            self.mark('recount_comments', {obj.post_id for obj in objs})
+        elif model is Post:
+            pks = {obj.pk for obj in objs}
+            self.mark('recount_comments', pks)
+            self.mark('recompute_visibility', pks)
+        elif model is Category:
+            pks = {obj.pk for obj in objs}
+            if None in pks:
+                self.full_pass.add('recompute_visibility')
+            else:
+                self.touched_categories |= pks
+
+    def mark(self, method, pks):
+        if method == 'recount_comments' and not self.recount:
+            return
+        if None in pks:
+            self.full_pass.add(method)
+        else:
+            self.touched[method] |= pks
+
+    def refresh(self, chunk_size=TOUCHED_CHUNK):
+        """Пересчёт постов, затронутых последней пачкой"""
+        for method, touched in self.touched.items():
+            pks = sorted(touched)
+            for start in range(0, len(pks), chunk_size):
+                getattr(
+                    Post.objects.filter(pk__in=pks[start:start + chunk_size]),
+                    method
+                )()
+            touched.clear()
+        if self.touched_categories:
+            Post.objects.filter(
+                category__in=sorted(self.touched_categories)
+            ).recompute_visibility()
+            self.touched_categories.clear()
+
+
+EXPORT_MODELS = {'post': Post, 'comment': Comment}
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_queryset(model, category=None, author=None, since=None,
+                    until=None):
+    """Выборка для выгрузки с необязательными фильтрами"""
+    if model is Post:
+        date_field, category_lookup = 'pub_date', 'category__slug'
+    else:
+        date_field, category_lookup = 'created_at', 'post__category__slug'
+    filters = {}
+    if category:
+        filters[category_lookup] = category
+    if author:
+        filters['author__username'] = author
+    if since:
+        filters[f'{date_field}__gte'] = since
+    if until:
+        filters[f'{date_field}__lt'] = until
+    return model.objects.filter(**filters).order_by('pk')
+
+
+def export_fields(model):
+    return [
+        field.name for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+
+
+def _iter_rows(queryset, fields, chunk_size):
+    return queryset.values_list('pk', *fields).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def iter_jsonl(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки JSON Lines в формате фикстур (читаются bulk_load)"""
+    label = queryset.model._meta.label_lower
+    fields = export_fields(queryset.model)
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for pk, *values in _iter_rows(queryset, fields, chunk_size):
+        yield encoder.encode({
+            'model': label, 'pk': pk, 'fields': dict(zip(fields, values))
+        }) + '\n'
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer, возвращающий строку"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    fields = export_fields(queryset.model)
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['id', *fields])
+    for row in _iter_rows(queryset, fields, chunk_size):
+        yield writer.writerow(row)
@@ -0,0 +1,59 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CARDS_GENERATION_KEY = 'blog:cards-generation'
+FEED_GENERATION_KEY = 'blog:feed-generation'
+COUNT_GENERATION_KEY = 'blog:count-generation'
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+
+
+def get_generation(key):
+    """Текущее поколение кэша; меняется при каждой инвалидации"""
+    generation = cache.get(key)
+    if generation is None:
+        # После вытеснения ключа начинаем с метки времени, чтобы
+        # не совпасть со старыми поколениями
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_cards_generation():
+    """Сброс всех карточек постов (категория, место или автор изменились)"""
+    bump_generation(CARDS_GENERATION_KEY)
+
+
+def invalidate_feeds():
+    """Сброс закэшированных страниц лент.
+
+    Второй сброс после коммита не даёт параллельному запросу закэшировать
+    страницу, прочитанную до фиксации транзакции.
+    """
+    bump_generation(FEED_GENERATION_KEY)
+    cache.delete(NEXT_PUBLICATION_KEY)
+    transaction.on_commit(lambda: bump_generation(FEED_GENERATION_KEY))
+
+
+def invalidate_feed_counts():
+    """Сброс закэшированного числа постов в лентах.
+
+    Отдельно от invalidate_feeds: комментарии и правки авторов лент
+    сбрасывают страницы, но набор постов в лентах не меняют.
+    """
+    bump_generation(COUNT_GENERATION_KEY)
+    transaction.on_commit(lambda: bump_generation(COUNT_GENERATION_KEY))
+
+
+def page_cache_key(request):
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return 'blog:page:{}:{}'.format(get_generation(FEED_GENERATION_KEY), url)
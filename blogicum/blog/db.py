@@ -0,0 +1,42 @@
+"""Настройка соединений с базой.
+
+SQLite: PRAGMA из BLOG_SQLITE_PRAGMAS на каждом новом соединении.
+Постоянные соединения (CONN_MAX_AGE): в начале запроса помечаются, а
+ping-запрос уходит при первом обращении запроса к алиасу (его выбирает
+роутер, см. blog.routers); оборванное сервером соединение закрывается и
+открывается заново. Как CONN_HEALTH_CHECKS из Django 4.1: алиасы, к
+которым запрос не обращается, не проверяются.
+"""
+from django.conf import settings
+from django.db import connections
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.BLOG_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def mark_persistent_connections(**kwargs):
+    """Отмечает соединения для проверки; запросов к базе не делает"""
+    if not settings.BLOG_DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        connection.blog_health_check_pending = True
+
+
+def check_connection(alias):
+    """Проверка постоянного соединения перед первым использованием"""
+    connection = connections[alias]
+    if not getattr(connection, 'blog_health_check_pending', False):
+        return
+    connection.blog_health_check_pending = False
+    if (
+        connection.connection is not None
+        and connection.settings_dict['CONN_MAX_AGE'] != 0
+        and not connection.in_atomic_block
+        and not connection.is_usable()
+    ):
+        connection.close()
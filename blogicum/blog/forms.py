@@ -32,3 +32,34 @@ class PostCreationForm(forms.ModelForm):
             # 'pub_date': forms.DateInput(attrs={'type': 'date'}),
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
         }
+
+
+class ExportForm(forms.Form):
+    """Параметры выгрузки постов и комментариев."""
+
+    model = forms.ChoiceField(
+        choices=(('post', 'Посты'), ('comment', 'Комментарии')),
+        initial='post', required=False
+    )
+    format = forms.ChoiceField(
+        choices=(('jsonl', 'JSON Lines'), ('csv', 'CSV')),
+        initial='jsonl', required=False
+    )
+    category = forms.SlugField(required=False)
+    author = forms.CharField(required=False)
+    since = forms.DateTimeField(required=False)
+    until = forms.DateTimeField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name in ('model', 'format'):
+            cleaned_data[name] = (
+                cleaned_data.get(name) or self.fields[name].initial
+            )
+        return cleaned_data
+
+
+class SearchForm(forms.Form):
+    """Поиск по постам."""
+
+    q = forms.CharField(label='Поиск', max_length=200, required=False)
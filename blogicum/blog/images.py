@@ -0,0 +1,97 @@
+"""Обработка изображений постов вне запроса.
+
+После сохранения поста с новым изображением задача ставится в очередь
+пула потоков (transaction.on_commit). Воркер строит уменьшенные копии
+BLOG_IMAGE_WIDTHS и web-оптимизированную копию оригинала в JPEG и
+записывает их размеры в Post.image_renditions:
+
+    {'width': 1920, 'height': 1080, 'variants': [
+        {'width': 320, 'height': 180, 'name': 'images/renditions/...'},
+        ...
+    ]}
+"""
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from . import workers
+from .models import Post
+
+RENDITIONS_DIR = 'images/renditions'
+JPEG_OPTIONS = {'quality': 82, 'optimize': True, 'progressive': True}
+
+
+def schedule_renditions(post):
+    """Ставит обработку изображения поста в очередь после коммита"""
+    mode = settings.BLOG_IMAGE_PIPELINE
+    if mode == 'off' or not post.image:
+        return
+    pk, name = post.pk, post.image.name
+    if mode == 'sync':
+        transaction.on_commit(lambda: process_post_image(pk, name))
+    else:
+        transaction.on_commit(
+            lambda: workers.submit(process_post_image, pk, name)
+        )
+
+
+def build_renditions(name, widths=None):
+    """Создаёт файлы копий и возвращает метаданные для image_renditions"""
+    widths = widths or settings.BLOG_IMAGE_WIDTHS
+    with default_storage.open(name) as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        image = background
+    width, height = image.size
+    stem = PurePosixPath(name).stem
+    variants = []
+    for target in sorted({w for w in widths if w < width} | {width}):
+        target_height = max(round(height * target / width), 1)
+        resized = (
+            image if target == width
+            else image.resize(
+                (target, target_height), Image.Resampling.LANCZOS
+            )
+        )
+        buffer = BytesIO()
+        resized.save(buffer, 'JPEG', **JPEG_OPTIONS)
+        saved_name = default_storage.save(
+            f'{RENDITIONS_DIR}/{stem}_{target}w.jpg',
+            ContentFile(buffer.getvalue())
+        )
+        variants.append(
+            {'width': target, 'height': target_height, 'name': saved_name}
+        )
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+def process_post_image(pk, name):
+    renditions = build_renditions(name)
+    # Пока шла обработка, изображение могли заменить — тогда не пишем
+    updated = Post.objects.filter(pk=pk, image=name).update(
+        image_renditions=renditions
+    )
+    if not updated:
+        delete_renditions(renditions)
+    return renditions
+
+
+def delete_renditions(renditions):
+    for variant in renditions.get('variants', ()):
+        default_storage.delete(variant['name'])
+
+
+def reset_renditions(post):
+    """Сбрасывает копии перед сохранением поста с новым изображением"""
+    stale = post.image_renditions
+    post.image_renditions = {}
+    if stale:
+        transaction.on_commit(lambda: delete_renditions(stale))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.batches import batched
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.excerpt (анонс для карточек ленты)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов обновлять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        def report(processed, changed):
+            self.stdout.write(f'Обработано постов: {processed}')
+
+        processed, changed = batched(
+            Post.objects.all(), 'refresh_excerpts', options['batch_size'],
+            on_batch=report
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено анонсов: {changed}'
+        ))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.bulk import (
+    EXPORT_CHUNK_SIZE, EXPORT_MODELS, export_queryset, iter_csv, iter_jsonl
+)
+from blog.forms import ExportForm
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты или комментарии в JSON Lines (формат '
+        'фикстур, читается bulk_load) или CSV'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', default='post', choices=sorted(EXPORT_MODELS)
+        )
+        parser.add_argument(
+            '--format', default='jsonl', choices=('jsonl', 'csv')
+        )
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--since', help='Не раньше этой даты.')
+        parser.add_argument('--until', help='Раньше этой даты.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+        parser.add_argument(
+            '--output', '-o', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+
+    def handle(self, *args, **options):
+        form = ExportForm({
+            name: options[name] for name in (
+                'model', 'format', 'category', 'author', 'since', 'until'
+            ) if options[name]
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        data = form.cleaned_data
+        queryset = export_queryset(
+            EXPORT_MODELS[data['model']], data['category'], data['author'],
+            data['since'], data['until']
+        )
+        rows = (iter_jsonl if data['format'] == 'jsonl' else iter_csv)(
+            queryset, chunk_size=options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(rows)
+        else:
+            for row in rows:
+                self.stdout.write(row, ending='')
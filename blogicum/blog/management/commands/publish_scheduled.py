@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog import schedule
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает отложенные посты, время которых наступило; с --loop '
+        'работает как фоновый планировщик'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять снова.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Наибольшая пауза между проверками, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = schedule.publish_scheduled()
+            if published:
+                self.stdout.write(f'Опубликовано постов: {published}')
+            if not options['loop']:
+                break
+            close_old_connections()
+            delay = schedule.seconds_until_next_publication()
+            time.sleep(
+                options['interval'] if delay is None
+                else min(max(delay, 0.1), options['interval'])
+            )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from blog.batches import batched
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает Post.is_visible (например, после массовой смены '
+        'публикации категорий)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов обновлять в одной транзакции.'
+        )
+        parser.add_argument(
+            '--category', action='append', default=[],
+            help='Slug категории; можно указать несколько раз.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options['category']:
+            posts = posts.filter(category__slug__in=options['category'])
+
+        def report(processed, changed):
+            self.stdout.write(
+                f'Обработано постов: {processed}, изменено: {changed}'
+            )
+
+        processed, changed = batched(
+            posts, 'recompute_visibility', options['batch_size'],
+            on_batch=report
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Видимость изменена у постов: {changed}'
+        ))
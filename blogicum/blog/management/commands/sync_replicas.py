@@ -0,0 +1,35 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в файлы реплик из DJANGO_DB_REPLICAS '
+        '(для локальной проверки чтения с реплик)'
+    )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if not primary['ENGINE'].endswith('sqlite3'):
+            raise CommandError(
+                'Команда работает только с SQLite; реплики PostgreSQL '
+                'настраиваются средствами репликации самой СУБД.'
+            )
+        if not settings.BLOG_READ_REPLICAS:
+            raise CommandError('Реплики не заданы (DJANGO_DB_REPLICAS).')
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.BLOG_READ_REPLICAS:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    # backup() даёт целостный снимок даже при записи в базу
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: скопировано')
+        finally:
+            source.close()
+        self.stdout.write(self.style.SUCCESS('Реплики обновлены'))
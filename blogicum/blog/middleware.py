@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import routers
+
+
+class RequestMetrics:
+    """Счётчики одного запроса"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        if self.render_started is not None:
+            self.render_time = time.perf_counter() - self.render_started
+
+
+class ViewStats:
+    """Агрегаты по представлениям в памяти процесса"""
+
+    def __init__(self, window=settings.BLOG_VIEW_METRICS_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, view_name, queries, db_time, render_time, total):
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = {
+                    'requests': 0,
+                    'queries': 0,
+                    'db_time': 0.0,
+                    'render_time': 0.0,
+                    'total_time': 0.0,
+                    'max_queries': 0,
+                    'latencies': deque(maxlen=self.window),
+                }
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['db_time'] += db_time
+            stats['render_time'] += render_time
+            stats['total_time'] += total
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['latencies'].append(total)
+
+    def snapshot(self):
+        with self._lock:
+            views = {
+                name: dict(stats, latencies=sorted(stats['latencies']))
+                for name, stats in self._views.items()
+            }
+        return {
+            name: self._summary(stats) for name, stats in views.items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    @staticmethod
+    def _summary(stats):
+        requests = stats['requests']
+        latencies = stats['latencies']
+
+        def percentile(share):
+            index = min(len(latencies) - 1, int(len(latencies) * share))
+            return latencies[index]
+
+        return {
+            'requests': requests,
+            'avg_queries': round(stats['queries'] / requests, 2),
+            'max_queries': stats['max_queries'],
+            'avg_db_ms': round(stats['db_time'] / requests * 1000, 3),
+            'avg_render_ms': round(
+                stats['render_time'] / requests * 1000, 3
+            ),
+            'avg_total_ms': round(stats['total_time'] / requests * 1000, 3),
+            'p50_ms': round(percentile(0.5) * 1000, 3),
+            'p99_ms': round(percentile(0.99) * 1000, 3),
+        }
+
+
+view_stats = ViewStats()
+
+
+class ViewMetricsMiddleware:
+    """Число запросов к БД, время БД, шаблона и всего запроса.
+
+    Значения отдаются в заголовке Server-Timing и копятся в view_stats
+    (см. представление ViewStatsView). Работает без DEBUG: запросы
+    считаются через connection.execute_wrapper.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.BLOG_VIEW_METRICS:
+            return self.get_response(request)
+        metrics = request.view_metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        total = time.perf_counter() - metrics.started
+        response['Server-Timing'] = ', '.join((
+            'db;dur={:.1f};desc="{} queries"'.format(
+                metrics.db_time * 1000, metrics.queries
+            ),
+            'tpl;dur={:.1f}'.format(metrics.render_time * 1000),
+            'total;dur={:.1f}'.format(total * 1000),
+        ))
+        match = request.resolver_match
+        if match is not None:
+            view_stats.add(
+                match.view_name, metrics.queries, metrics.db_time,
+                metrics.render_time, total
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, 'view_metrics', None)
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплик и закрепляет писавших за основной базой.
+
+    После успешного POST авторизованного пользователя его запросы
+    BLOG_REPLICA_PIN_SECONDS секунд читают из default. Должен стоять
+    после SessionMiddleware и AuthenticationMiddleware.
+    """
+
+    session_key = 'blog_primary_until'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routers.replica_reads(False):
+            response = self.get_response(request)
+        if (
+            request.method == 'POST'
+            and response.status_code < 400
+            and request.user.is_authenticated
+            and settings.BLOG_READ_REPLICAS
+        ):
+            request.session[self.session_key] = (
+                time.time() + settings.BLOG_REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        fills_page_cache = getattr(view_class, 'fills_page_cache', None)
+        if (
+            request.method in ('GET', 'HEAD')
+            and getattr(view_class, 'read_replica', False)
+            and not self.pinned(request)
+            # Промах общего кэша страниц читает основную базу
+            and not (fills_page_cache and fills_page_cache(request))
+        ):
+            routers.enable_replica_reads()
+
+    def pinned(self, request):
+        if not request.user.is_authenticated:
+            return False
+        return request.session.get(self.session_key, 0) > time.time()
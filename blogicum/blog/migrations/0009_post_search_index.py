@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from blog import search
+    search.install(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    from blog import search
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -1,7 +1,20 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.views.decorators.http import condition
+from django.http import Http404
 from django.shortcuts import redirect
 from .forms import FormComment
 from django.urls import reverse
 from blog.models import Comment
+from . import routers, schedule
+from .cache import (
+    CARDS_GENERATION_KEY, FEED_GENERATION_KEY, get_generation, page_cache_key
+)
+from .images import reset_renditions, schedule_renditions
+from .paginators import CachedCountPaginator, KeysetPaginator
 
 
 class OnlyAuthorMixin:
@@ -14,6 +27,19 @@ class OnlyAuthorMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+class ImageRenditionsMixin:
+    """Перестраивает копии изображения, если оно изменилось в форме"""
+
+    def form_valid(self, form):
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            reset_renditions(form.instance)
+        response = super().form_valid(form)
+        if image_changed:
+            schedule_renditions(self.object)
+        return response
+
+
 class CommentMixin:
     model = Comment
     template_name = 'blog/comment.html'
@@ -31,3 +57,213 @@ class CommentMixin:
         return reverse(
             'blog:post_detail', kwargs={'pk': self.kwargs['post_id']}
         )
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация ленты по (pub_date, id)"""
+
+    cursor_kwarg = 'cursor'
+    keyset_ordering = ('-pub_date', '-id')
+
+    def use_keyset_pagination(self):
+        return (
+            settings.BLOG_KEYSET_PAGINATION
+            or self.cursor_kwarg in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering=self.keyset_ordering
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page, page.has_other_pages()
+
+
+class ElidedPageRangeMixin:
+    """Окно номеров страниц вокруг текущей вместо всего page_range.
+
+    Шаблону отдаётся page_range — номера из get_elided_page_range с
+    многоточиями, так что размер пагинатора не зависит от числа страниц.
+    """
+
+    pages_on_each_side = 2
+    pages_on_ends = 1
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None and not getattr(page, 'is_keyset', False):
+            context['page_range'] = list(
+                page.paginator.get_elided_page_range(
+                    page.number,
+                    on_each_side=self.pages_on_each_side,
+                    on_ends=self.pages_on_ends,
+                )
+            )
+        return context
+
+
+class CachedCountMixin:
+    """Число постов ленты из кэша (см. CachedCountPaginator)"""
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg, None)
+        return make_etag(
+            self.request.resolver_match.view_name,
+            sorted(self.kwargs.items()),
+            params.urlencode(),
+        )
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_key=self.get_count_cache_key(), **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified и ответ 304 до запросов к базе и рендера.
+
+    По умолчанию ETag страницы ленты строится из поколений кэша лент и
+    карточек, адреса и пользователя: любая правка, влияющая на ленты,
+    уже сдвигает эти поколения.
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        schedule.publish_due()
+        if routers.reading_replica():
+            # Страница с отстающей реплики не должна получить ETag
+            # текущего поколения, иначе клиент хранил бы её до записи
+            return None
+        return make_etag(
+            get_generation(FEED_GENERATION_KEY),
+            get_generation(CARDS_GENERATION_KEY),
+            request.user.pk,
+            request.get_full_path(),
+        )
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        view = condition(
+            etag_func=self.get_etag, last_modified_func=self.get_last_modified
+        )(super().dispatch)
+        return view(request, *args, **kwargs)
+
+
+class PostConditionalGetMixin(ConditionalGetMixin):
+    """Валидаторы страницы поста из его updated_at.
+
+    Пост читается один раз: тот же объект потом отдаёт get_object(),
+    так что проверка не добавляет запросов к базе. В странице есть
+    форма комментария с CSRF-токеном, поэтому ETag зависит и от
+    CSRF-cookie и ключа сессии (оба меняются при входе), а
+    авторизованным Last-Modified не отдаётся: после повторного входа
+    браузер не должен держать форму со старым токеном.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_post'):
+            self._post = super().get_object()
+        return self._post
+
+    def get_etag(self, request, *args, **kwargs):
+        # Прямая ссылка на пост, время которого только что наступило,
+        # не должна ждать запроса к ленте
+        schedule.publish_due()
+        return make_etag(
+            self.get_object().updated_at.isoformat(),
+            get_generation(CARDS_GENERATION_KEY),
+            request.user.pk,
+            request.META.get('CSRF_COOKIE'),
+            request.session.session_key,
+            request.get_full_path(),
+        )
+
+    def get_last_modified(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return self.get_object().updated_at
+
+
+def make_etag(*parts):
+    return hashlib.md5(
+        ':'.join(map(str, parts)).encode()
+    ).hexdigest()
+
+
+class AnonymousPageCacheMixin:
+    """Кэш целой страницы для неавторизованных посетителей.
+
+    Ключ включает поколение лент, которое сбрасывается при любых
+    изменениях постов, комментариев, категорий и местоположений,
+    а также при наступлении времени отложенной публикации.
+    """
+
+    page_cache_timeout = settings.BLOG_PAGE_CACHE_TIMEOUT
+
+    @classmethod
+    def fills_page_cache(cls, request):
+        """Читается ли запрос из общего кэша страниц (и пишется в него)"""
+        return bool(
+            cls.page_cache_timeout
+            and request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+        )
+
+    def get_page_cache_timeout(self):
+        return schedule.cap_timeout(self.page_cache_timeout)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.fills_page_cache(request):
+            return super().dispatch(request, *args, **kwargs)
+        schedule.publish_due()
+        key = page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method == 'GET' and response.status_code == 200:
+            timeout = self.get_page_cache_timeout()
+            response.add_post_render_callback(
+                lambda rendered: cache.set(key, rendered, timeout)
+            )
+        return response
+
+
+class CommentPageMixin:
+    """Комментарии поста порциями по (created_at, id)"""
+
+    comments_per_page = settings.BLOG_COMMENTS_PER_PAGE
+    cursor_kwarg = 'cursor'
+
+    def get_comments_page(self, post):
+        paginator = KeysetPaginator(
+            post.comment.select_related('author'),
+            self.comments_per_page,
+            ordering=('created_at', 'id')
+        )
+        try:
+            return paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page(self.object)
+        return context
@@ -1,13 +1,43 @@
-from django.db import models
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db.models import Count
+from django.utils.text import Truncator
+from django.db.models import (
+    BooleanField, Case, Count, Exists, F, Min, OuterRef, Q, Subquery, Value,
+    When
+)
+from django.db.models.functions import Coalesce, Greatest
+from .cache import invalidate_feed_counts, invalidate_feeds
 
 
 User = get_user_model()
 MAX_256 = 256
 TITLE = 'Заголовок'
 LINE_SLICE = 20
+# Поля, от которых зависит Post.is_visible
+VISIBILITY_FIELDS = frozenset(
+    ('is_published', 'pub_date', 'category', 'category_id')
+)
+# Поля, правка которых не меняет набор постов в лентах
+COUNT_NEUTRAL_FIELDS = frozenset(
+    ('comment_count', 'updated_at', 'image_renditions')
+)
+# Сколько pk пересчитывать за один UPDATE после update()
+VISIBILITY_PK_CHUNK = 500
+# Анонс поста в карточке ленты: как truncatewords:10
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 300
+
+
+def make_excerpt(text):
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(EXCERPT_MAX_LENGTH)
+
 
 # class DatabaseQueryManager(models.Manager):
 
@@ -15,14 +45,113 @@ LINE_SLICE = 20
 class DatabaseQueryManager(models.QuerySet):
     """Кастомный менеджер для фильтров"""
 
+    def update(self, **kwargs):
+        # update() не вызывает auto_now и сигналы, а по updated_at
+        # версионируются карточки постов, поэтому проставляем сами.
+        # Время берётся из Python: CURRENT_TIMESTAMP в SQLite точен
+        # только до секунды, и две правки подряд дали бы одну метку
+        kwargs.setdefault('updated_at', timezone.now())
+        if isinstance(kwargs.get('text'), str):
+            kwargs.setdefault('excerpt', make_excerpt(kwargs['text']))
+        if VISIBILITY_FIELDS.isdisjoint(kwargs):
+            rows = super().update(**kwargs)
+        else:
+            # После UPDATE фильтр queryset может уже не совпадать
+            # с теми же строками, поэтому запоминаем их pk заранее
+            with transaction.atomic(using=self.db):
+                pks = list(self.values_list('pk', flat=True))
+                rows = super().update(**kwargs)
+                for start in range(0, len(pks), VISIBILITY_PK_CHUNK):
+                    self.model.objects.using(self.db).filter(
+                        pk__in=pks[start:start + VISIBILITY_PK_CHUNK]
+                    ).recompute_visibility()
+        invalidate_feeds()
+        if not COUNT_NEUTRAL_FIELDS.issuperset(kwargs):
+            invalidate_feed_counts()
+        return rows
+
     def main_filter(self):
-        return self.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lt=timezone.now()
-        ).select_related(
+        return self.filter(is_visible=True).feed()
+
+    def feed(self):
+        """Всё для карточек ленты; полный текст карточкам не нужен"""
+        return self.select_related(
             'author', 'category', 'location'
-        ).annotate(comment_count=Count('comment')).order_by('-pub_date')
+        ).defer('text').order_by('-pub_date')
+
+    def visible_to(self, user):
+        """Опубликованные посты и все посты самого пользователя"""
+        visible = Q(is_visible=True)
+        if user.is_authenticated:
+            visible |= Q(author=user)
+        return self.filter(visible)
+
+    def next_pub_date(self):
+        """Ближайшая отложенная публикация или None.
+
+        Без условия pub_date > now: просроченный, но ещё не открытый
+        пост тоже должен запустить publish_due().
+        """
+        return self.filter(
+            is_published=True, is_visible=False,
+            category__is_published=True
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+
+    def update_comment_count(self, delta):
+        """Сдвиг счётчика комментариев без чтения строк"""
+        return self.update(
+            comment_count=Greatest(F('comment_count') + delta, 0)
+        )
+
+    def recount_comments(self):
+        """Пересчёт счётчика комментариев по таблице комментариев"""
+        totals = Coalesce(Subquery(
+            Comment.objects.filter(
+                post=OuterRef('pk')
+            ).order_by().values('post').annotate(
+                total=Count('pk')
+            ).values('total')
+        ), 0)
+        return self.exclude(comment_count=totals).update(comment_count=totals)
+
+    def recompute_visibility(self):
+        """Пересчёт is_visible; возвращает число изменённых постов"""
+        visible = visibility_expression(timezone.now())
+        return self.exclude(is_visible=visible).update(is_visible=visible)
+
+    def refresh_excerpts(self):
+        """Пересчёт анонсов; возвращает число изменённых постов"""
+        changed = []
+        for post in self.only('pk', 'text', 'excerpt'):
+            excerpt = make_excerpt(post.text)
+            if post.excerpt != excerpt:
+                post.excerpt = excerpt
+                changed.append(post)
+        if changed:
+            self.model.objects.bulk_update(changed, ['excerpt'])
+        return len(changed)
+
+    def due_for_publication(self):
+        """Отложенные посты, время публикации которых наступило"""
+        return self.filter(
+            is_published=True, is_visible=False,
+            pub_date__lte=timezone.now()
+        )
+
+
+def visibility_expression(now):
+    """is_visible как SQL-выражение по полям поста и его категории"""
+    category_published = Exists(Category.objects.filter(
+        pk=OuterRef('category_id'), is_published=True
+    ))
+    return Case(
+        When(
+            Q(is_published=True, pub_date__lte=now) & Q(category_published),
+            then=Value(True)
+        ),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
 
 
 class PublishedModel(models.Model):
@@ -122,6 +251,29 @@ class Post(PublishedModel):
         ),
         default=timezone.now
     )
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменено')
+    excerpt = models.CharField(
+        max_length=EXCERPT_MAX_LENGTH, blank=True, editable=False,
+        verbose_name='Анонс',
+        help_text=(
+            'Начало текста для карточки в ленте; строится при сохранении.'
+        )
+    )
+    is_visible = models.BooleanField(
+        default=False, editable=False, verbose_name='Виден в лентах',
+        help_text=(
+            'Пост и категория опубликованы, время публикации наступило. '
+            'Поддерживается при сохранении, сменах категории и планировщиком.'
+        )
+    )
+    image_renditions = models.JSONField(
+        default=dict, blank=True, editable=False,
+        verbose_name='Копии изображения',
+        help_text='Размеры оригинала и уменьшенных копий (см. blog.images).'
+    )
 
     # objects = DatabaseQueryManager()  # Кастомный менеджер
     objects = DatabaseQueryManager.as_manager()
@@ -133,6 +285,28 @@ class Post(PublishedModel):
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            # Лента: видимые посты от новых к старым
+            models.Index(
+                fields=('-pub_date', '-id'), name='post_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            # Лента категории
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            # Отложенные публикации для планировщика
+            models.Index(
+                fields=('pub_date',), name='post_scheduled_idx',
+                condition=models.Q(is_published=True, is_visible=False)
+            ),
+            # Профиль: автор видит и снятые с публикации посты
+            models.Index(
+                fields=('author', '-pub_date'), name='post_author_feed_idx'
+            ),
+        )
 
     def __str__(self):
         return (
@@ -141,6 +315,77 @@ class Post(PublishedModel):
             else self.title
         )
 
+    def save(self, *args, **kwargs):
+        self.is_visible = self.compute_is_visible()
+        update_fields = kwargs.get('update_fields')
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+        if update_fields is not None:
+            # updated_at — версия карточки и валидатор страницы поста:
+            # auto_now сработает, только если поле есть в update_fields
+            update_fields = {*update_fields, 'updated_at'}
+            if not VISIBILITY_FIELDS.isdisjoint(update_fields):
+                update_fields.add('is_visible')
+            if 'text' in update_fields:
+                update_fields.add('excerpt')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def compute_is_visible(self):
+        return bool(
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category_id is not None
+            and self.category.is_published
+        )
+
+    def image_variant_url(self, width):
+        """Наименьшая копия не уже width; пока копий нет — оригинал"""
+        variants = self.image_renditions.get('variants', [])
+        for variant in variants:
+            if variant['width'] >= width:
+                return default_storage.url(variant['name'])
+        if variants:
+            return default_storage.url(variants[-1]['name'])
+        return self.image.url
+
+    @property
+    def thumbnail_url(self):
+        return self.image_variant_url(settings.BLOG_CARD_IMAGE_WIDTH)
+
+
+class CommentQuerySet(models.QuerySet):
+    """Удаление комментариев со сдвигом счётчиков их постов.
+
+    Сдвиг делается здесь и в Comment.delete(), а не в сигнале
+    post_delete: приёмник сигнала отключил бы быстрое каскадное
+    удаление комментариев вместе с постом одним DELETE.
+    """
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            shifts = self.counts_by_post()
+            result = super().delete()
+            shift_comment_counts(shifts, -1)
+        return result
+
+    def counts_by_post(self):
+        """{число комментариев: [pk постов]} — для сдвига пачками"""
+        by_count = defaultdict(list)
+        for post_id, total in self.order_by().values('post').annotate(
+            total=Count('pk')
+        ).values_list('post', 'total'):
+            by_count[total].append(post_id)
+        return by_count
+
+
+def shift_comment_counts(by_count, sign):
+    """Один UPDATE на каждое различное число комментариев"""
+    for total, post_ids in by_count.items():
+        Post.objects.filter(pk__in=post_ids).update_comment_count(
+            sign * total
+        )
+
 
 class Comment(PublishedModel):  # UserComments
     """Коментарии"""
@@ -149,6 +394,8 @@ class Comment(PublishedModel):  # UserComments
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta(PublishedModel.Meta):
         """Перевод модели"""
 
@@ -162,3 +409,9 @@ class Comment(PublishedModel):  # UserComments
             if len(self.text) > LINE_SLICE
             else self.text
         )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            result = super().delete(*args, **kwargs)
+            Post.objects.filter(pk=self.post_id).update_comment_count(-1)
+        return result
@@ -0,0 +1,235 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+from .cache import COUNT_GENERATION_KEY, get_generation
+
+
+class InvalidCursor(InvalidPage):
+    """Курсор не удалось разобрать"""
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации"""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки вместо OFFSET.
+
+    Порядок задаётся кортежем полей с общим направлением сортировки,
+    последним полем должен быть уникальный ключ (обычно id). Курсор
+    кодирует значения ключа у крайнего объекта страницы и направление.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._build_page(self._fetch(None, self.NEXT), None)
+        direction, values = self.decode_cursor(cursor)
+        return self._build_page(self._fetch(values, direction), direction)
+
+    def _fetch(self, values, direction):
+        backwards = direction == self.PREVIOUS
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        if backwards:
+            ordering = [self._flip(name) for name in self.ordering]
+        else:
+            ordering = self.ordering
+        return list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+    def _build_page(self, rows, direction):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == self.PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, direction is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(self.NEXT, rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(self.PREVIOUS, rows[0])
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def _seek(self, values, backwards):
+        """Лексикографическое сравнение (a, b) < (x, y) в виде Q"""
+        lookup = 'lt' if self.descending != backwards else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            for prev_field, prev_value in zip(
+                self.fields[:index], values[:index]
+            ):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else '-' + name
+
+    def _model_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, direction, obj):
+        values = [
+            self._model_field(name).value_to_string(obj)
+            for name in self.fields
+        ]
+        raw = json.dumps([direction, *values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, *raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            if len(raw_values) != len(self.fields):
+                raise ValueError(raw_values)
+            values = [
+                self._model_field(name).to_python(value)
+                for name, value in zip(self.fields, raw_values)
+            ]
+        except (
+            binascii.Error, UnicodeDecodeError, ValueError, TypeError,
+            ValidationError
+        ):
+            raise InvalidCursor('Некорректный курсор')
+        return direction, values
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор админки без точного COUNT(*) по большим таблицам.
+
+    Без фильтров число строк берётся из статистики PostgreSQL
+    (pg_class.reltuples) или как MAX(pk) — это чтение одного края
+    индекса. С фильтрами строки считаются точно, но не дальше
+    BLOG_ADMIN_COUNT_LIMIT: дальние страницы списка не показываются.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.BLOG_ADMIN_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self.estimate(queryset)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return queryset.order_by()[:limit].count()
+
+    @staticmethod
+    def estimate(queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # -1 — таблица ещё не анализировалась
+            if row and row[0] > 0:
+                return int(row[0])
+            return None
+        return queryset.model._default_manager.using(
+            queryset.db
+        ).aggregate(max_pk=Max('pk'))['max_pk']
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор лент с COUNT из кэша.
+
+    Ключ count_key задаёт представление; в кэше он живёт в поколении
+    счётчиков, которое сдвигают только правки, меняющие набор постов
+    в лентах (см. invalidate_feed_counts), а не комментарии. На
+    PostgreSQL при больших выборках вместо COUNT берётся оценка
+    планировщика (BLOG_FEED_APPROX_COUNT_FROM); на последних страницах
+    она может немного расходиться с реальным числом постов.
+    """
+
+    def __init__(self, *args, count_key, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        key = 'blog:count:{}:{}'.format(
+            get_generation(COUNT_GENERATION_KEY), self.count_key
+        )
+        count = cache.get(key)
+        if count is None:
+            count = planner_estimate(self.object_list)
+            if count is None:
+                count = self.object_list.count()
+            cache.set(key, count, settings.BLOG_FEED_COUNT_TIMEOUT)
+        return count
+
+
+def planner_estimate(queryset):
+    """Оценка числа строк из EXPLAIN, если она не меньше порога.
+
+    Только PostgreSQL: SQLite не отдаёт оценок числа строк.
+    """
+    threshold = settings.BLOG_FEED_APPROX_COUNT_FROM
+    connection = connections[queryset.db]
+    if threshold is None or connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    rows = int(plan[0]['Plan']['Plan Rows'])
+    return rows if rows >= threshold else None
@@ -0,0 +1,86 @@
+"""Пакетная публикация и снятие с публикации.
+
+Строки меняются пачками по pk, каждая пачка — отдельная короткая
+транзакция вместе с записями журнала админки (LogEntry), так что
+блокировка записи в SQLite не держится на всё время операции.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from . import workers
+from .cache import bump_cards_generation, invalidate_feeds
+from .models import Category, Post
+from .visibility import recompute_in_batches
+
+logger = logging.getLogger(__name__)
+
+CHANGE_MESSAGE = json.dumps([{'changed': {'fields': ['is_published']}}])
+
+
+def set_published(queryset, value, user_id, batch_size=None,
+                  on_batch=None):
+    """Ставит is_published=value строкам queryset; возвращает их число.
+
+    Изменения записываются в журнал от имени user_id (если он задан),
+    on_batch(done) вызывается после каждой пачки.
+    """
+    batch_size = batch_size or settings.BLOG_PUBLISH_BATCH_SIZE
+    model = queryset.model
+    content_type_id = ContentType.objects.get_for_model(model).pk
+    pending = queryset.exclude(is_published=value).order_by('pk')
+    done, last_pk = 0, None
+    try:
+        while True:
+            batch = pending if last_pk is None else pending.filter(
+                pk__gt=last_pk
+            )
+            objs = list(batch[:batch_size])
+            if not objs:
+                break
+            with transaction.atomic(using=queryset.db):
+                model.objects.using(queryset.db).filter(
+                    pk__in=[obj.pk for obj in objs]
+                ).update(is_published=value)
+                if user_id is not None:
+                    log_changes(objs, user_id, content_type_id, queryset.db)
+            if model is Category:
+                recompute_in_batches(Post.objects.using(queryset.db).filter(
+                    category_id__in=[obj.pk for obj in objs]
+                ))
+            done += len(objs)
+            last_pk = objs[-1].pk
+            logger.info(
+                '%s: is_published=%s, обработано %s',
+                model._meta.label, value, done
+            )
+            if on_batch:
+                on_batch(done)
+    finally:
+        # Карточки и ленты сбрасываются и при прерванной операции
+        if done:
+            bump_cards_generation()
+            invalidate_feeds()
+    return done
+
+
+def log_changes(objs, user_id, content_type_id, using):
+    LogEntry.objects.using(using).bulk_create([
+        LogEntry(
+            user_id=user_id, content_type_id=content_type_id,
+            object_id=str(obj.pk), object_repr=str(obj)[:200],
+            action_flag=CHANGE, change_message=CHANGE_MESSAGE,
+        )
+        for obj in objs
+    ])
+
+
+def set_published_in_background(queryset, value, user_id):
+    """То же в фоновом потоке после коммита текущей транзакции"""
+    transaction.on_commit(
+        lambda: workers.submit(set_published, queryset, value, user_id)
+    )
@@ -0,0 +1,70 @@
+"""Чтение публичных страниц с реплик.
+
+Реплики перечислены в BLOG_READ_REPLICAS (алиасы DATABASES). Читать с
+них разрешает ReplicaRoutingMiddleware — только в безопасных запросах
+к представлениям с read_replica = True и только если пользователь
+недавно ничего не менял (иначе он мог бы не увидеть свою правку, пока
+реплика догоняет основную базу). Запись всегда идёт в default.
+
+Ответы, которые кэшируются под поколением лент (общий кэш страниц,
+ETag лент), строятся только по основной базе: иначе отстающая реплика
+записала бы старую страницу под новое поколение.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .db import check_connection
+
+_replica_reads = ContextVar('blog_replica_reads', default=False)
+
+
+def choose_replica():
+    return random.choice(settings.BLOG_READ_REPLICAS)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def enable_replica_reads():
+    """Включает чтение с реплик до конца текущего replica_reads()"""
+    _replica_reads.set(True)
+
+
+def reading_replica():
+    """Читает ли текущий запрос с реплики"""
+    return _replica_reads.get() and bool(settings.BLOG_READ_REPLICAS)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and settings.BLOG_READ_REPLICAS:
+            alias = choose_replica()
+        else:
+            alias = DEFAULT_DB_ALIAS
+        # Роутер — первое обращение запроса к алиасу: здесь и проверяем
+        check_connection(alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется всё равно в default
+        check_connection(DEFAULT_DB_ALIAS)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.BLOG_READ_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными от основной базы
+        return db not in settings.BLOG_READ_REPLICAS
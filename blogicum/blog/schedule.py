@@ -0,0 +1,80 @@
+"""Отложенные публикации.
+
+Отложенный пост становится видимым (Post.is_visible), когда наступает
+его pub_date. Здесь хранится момент ближайшей такой публикации: до него
+закэшированные ленты верны, а после него посты нужно открыть и ленты
+сбросить. Это делает первый заметивший запрос (publish_due) или фоновый
+планировщик manage.py publish_scheduled --loop.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import routers
+from .cache import NEXT_PUBLICATION_KEY, invalidate_feeds
+from .models import Post
+
+# Значение в кэше, когда отложенных публикаций нет
+NOTHING_SCHEDULED = 0
+
+
+def next_publication():
+    """Ближайшая отложенная публикация (datetime) или None"""
+    timestamp = cache.get(NEXT_PUBLICATION_KEY)
+    if timestamp is None:
+        # Только основная база: отстающая реплика могла бы не знать о
+        # новом отложенном посте, а ответ кэшируется надолго
+        with routers.replica_reads(False):
+            next_pub_date = Post.objects.next_pub_date()
+        timestamp = (
+            next_pub_date.timestamp() if next_pub_date
+            else NOTHING_SCHEDULED
+        )
+        cache.set(
+            NEXT_PUBLICATION_KEY, timestamp,
+            settings.BLOG_SCHEDULE_RECHECK_TIMEOUT
+        )
+    if timestamp == NOTHING_SCHEDULED:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def seconds_until_next_publication():
+    next_pub_date = next_publication()
+    if next_pub_date is None:
+        return None
+    return (next_pub_date - timezone.now()).total_seconds()
+
+
+def cap_timeout(timeout):
+    """Ограничивает время жизни кэша ленты ближайшей публикацией"""
+    delay = seconds_until_next_publication()
+    if delay is None:
+        return timeout
+    return min(timeout, max(int(delay), 1))
+
+
+def publish_scheduled():
+    """Открывает посты, время которых наступило; возвращает их число"""
+    published = Post.objects.due_for_publication().recompute_visibility()
+    invalidate_feeds()
+    return published
+
+
+def publish_due():
+    """Сбрасывает ленты, если наступило время отложенной публикации.
+
+    Вызывается перед чтением кэшей лент; в обычном случае это одно
+    обращение к кэшу. Сбрасывает ленты только первый запрос, заметивший
+    публикацию.
+    """
+    next_pub_date = next_publication()
+    if next_pub_date is None or next_pub_date > timezone.now():
+        return False
+    if cache.add(f'{NEXT_PUBLICATION_KEY}:{next_pub_date.timestamp()}', 1):
+        publish_scheduled()
+    else:
+        cache.delete(NEXT_PUBLICATION_KEY)
+    return True
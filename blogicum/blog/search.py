@@ -0,0 +1,131 @@
+"""Полнотекстовый поиск по постам.
+
+SQLite: внешняя FTS5-таблица blog_post_fts над blog_post, которую
+держат в актуальном состоянии триггеры (в том числе для update() и
+bulk_create). PostgreSQL: GIN-индекс по выражению to_tsvector(...).
+На остальных базах поиск сводится к icontains.
+"""
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.fields import FloatField
+
+FTS_TABLE = 'blog_post_fts'
+
+SQLITE_INSTALL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text, content='blog_post', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+PG_CONFIG = 'russian'
+PG_VECTOR = (
+    f"to_tsvector('{PG_CONFIG}', coalesce(blog_post.title, '') || ' ' || "
+    "coalesce(blog_post.text, ''))"
+)
+PG_QUERY = f"websearch_to_tsquery('{PG_CONFIG}', %s)"
+PG_INSTALL = (
+    'CREATE INDEX IF NOT EXISTS blog_post_search_idx ON blog_post '
+    f'USING GIN (({PG_VECTOR}))',
+)
+PG_UNINSTALL = ('DROP INDEX IF EXISTS blog_post_search_idx',)
+
+# Вес заголовка относительно текста в bm25
+SQLITE_TITLE_WEIGHT = 10.0
+
+
+def install(using=connection):
+    """Создаёт поисковый индекс; повторный вызов безопасен"""
+    statements = {'sqlite': SQLITE_INSTALL, 'postgresql': PG_INSTALL}
+    with using.cursor() as cursor:
+        for sql in statements.get(using.vendor, ()):
+            cursor.execute(sql)
+
+
+def repair(using=connection):
+    """Восстанавливает триггеры FTS5, если миграция перестроила blog_post.
+
+    SQLite меняет схему, пересоздавая таблицу, и триггеры пропадают
+    вместе со старой таблицей. Индекс PostgreSQL при этом не страдает.
+    """
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE %s",
+            [f'{FTS_TABLE}%'],
+        )
+        names = {row[0] for row in cursor.fetchall()}
+    if FTS_TABLE in names and not {
+        f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'
+    } <= names:
+        install(using)
+
+
+def uninstall(using=connection):
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': PG_UNINSTALL}
+    with using.cursor() as cursor:
+        for sql in statements.get(using.vendor, ()):
+            cursor.execute(sql)
+
+
+def fts_query(query):
+    """Запрос пользователя -> выражение MATCH: все слова, по префиксу"""
+    words = (word.replace('"', '""') for word in query.split())
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_posts(queryset, query):
+    """Отбирает посты по запросу и сортирует по релевантности (rank)"""
+    query = query.strip()
+    if not query:
+        return queryset.none()
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        queryset = queryset.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = blog_post.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[fts_query(query)],
+            select={
+                'rank': f'-bm25({FTS_TABLE}, {SQLITE_TITLE_WEIGHT}, 1.0)'
+            },
+        )
+    elif vendor == 'postgresql':
+        queryset = queryset.extra(
+            where=[f'{PG_VECTOR} @@ {PG_QUERY}'],
+            params=[query],
+            select={'rank': f'ts_rank({PG_VECTOR}, {PG_QUERY})'},
+            select_params=[query],
+        )
+    else:
+        queryset = queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).annotate(rank=Value(0.0, output_field=FloatField()))
+    return queryset.order_by('-rank', '-pub_date')
@@ -0,0 +1,112 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .cache import (
+    bump_cards_generation, invalidate_feed_counts, invalidate_feeds
+)
+from .models import (
+    Category, Comment, Location, Post, User, shift_comment_counts
+)
+from .visibility import recompute_in_batches
+
+
+# Удаление комментария сбрасывает ленты через сдвиг счётчика
+# (CommentQuerySet.delete); приёмник post_delete для Comment отключил бы
+# быстрое каскадное удаление
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+def post_or_comment_changed(sender, **kwargs):
+    invalidate_feeds()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, **kwargs):
+    invalidate_feed_counts()
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    instance._old_post_id = None
+    if not raw and not instance._state.adding:
+        instance._old_post_id = Comment.objects.filter(
+            pk=instance.pk
+        ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    # Счётчик сдвигается здесь, а не в представлениях: так его не
+    # обходят комментарии из админки и shell; удаления — см. модель.
+    # Правка комментария меняет страницу поста, а по updated_at
+    # строится её Last-Modified — update() двигает метку и без сдвига
+    if raw:
+        return
+    posts = Post.objects.filter(pk=instance.post_id)
+    old_post_id = getattr(instance, '_old_post_id', None)
+    if created:
+        posts.update_comment_count(1)
+    elif old_post_id is not None and old_post_id != instance.post_id:
+        # Комментарий перенесли к другому посту
+        posts.update_comment_count(1)
+        Post.objects.filter(pk=old_post_id).update_comment_count(-1)
+    else:
+        posts.update()
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Комментарии пользователя удалятся каскадом без сигналов; счётчики
+    # чужих постов сдвигаем заранее, одним UPDATE на каждое число
+    # комментариев (его собственные посты удаляются целиком)
+    shift_comment_counts(
+        Comment.objects.filter(author=instance).exclude(
+            post__author=instance
+        ).counts_by_post(),
+        -1
+    )
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_published(sender, instance, **kwargs):
+    instance._was_published = instance.pk and Category.objects.filter(
+        pk=instance.pk
+    ).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    # Видимость постов зависит только от is_published категории:
+    # правка названия или описания не должна обходить все её посты
+    if created or instance._was_published == instance.is_published:
+        return
+    recompute_in_batches(Post.objects.filter(category=instance))
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    # Посты остались без категории (SET_NULL) и из лент пропадают
+    Post.objects.filter(
+        category__isnull=True, is_visible=True
+    ).recompute_visibility()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def category_or_location_changed(sender, **kwargs):
+    bump_cards_generation()
+    invalidate_feeds()
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_cards_generation()
+    invalidate_feeds()
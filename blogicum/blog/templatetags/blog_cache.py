@@ -0,0 +1,11 @@
+from django import template
+
+from blog.cache import CARDS_GENERATION_KEY, get_generation
+
+register = template.Library()
+
+
+@register.simple_tag
+def cards_generation():
+    """Поколение кэша карточек, один раз на страницу ленты"""
+    return get_generation(CARDS_GENERATION_KEY)
@@ -0,0 +1,39 @@
+from django import template
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_image(post, css_class='', eager=False):
+    """<img> поста с srcset из готовых копий и собственными размерами.
+
+    Пока копии не построены, выводится оригинал без srcset. Картинки
+    ниже первого экрана грузятся лениво (eager=False).
+    """
+    renditions = post.image_renditions
+    attrs = [
+        ('class', css_class),
+        ('src', post.thumbnail_url),
+        ('alt', post.title),
+    ]
+    variants = renditions.get('variants')
+    if variants:
+        attrs += [
+            ('srcset', ', '.join(
+                f'{default_storage.url(v["name"])} {v["width"]}w'
+                for v in variants
+            )),
+            ('sizes', settings.BLOG_CARD_IMAGE_SIZES),
+            ('width', renditions['width']),
+            ('height', renditions['height']),
+        ]
+    attrs += [
+        ('loading', 'eager' if eager else 'lazy'),
+        ('decoding', 'async'),
+    ]
+    return format_html(
+        '<img{}>', format_html_join('', ' {}="{}"', attrs)
+    )
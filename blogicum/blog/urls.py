@@ -5,7 +5,12 @@ from . import views
 app_name = 'blog'
 urlpatterns = [
     path('', views.IndexListView.as_view(), name='index'),
+    path('search/', views.SearchListView.as_view(), name='search'),
     path('posts/<int:pk>/', views.PostDetail.as_view(), name='post_detail'),
+    path(
+        'posts/<int:pk>/comments/', views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/edit/', views.PostUpdateView.as_view(),
         name='edit_post'
@@ -40,5 +45,7 @@ urlpatterns = [
     path(
         'posts/<post_id>/delete_comment/<comment_id>/',
         views.CommentDeleteView.as_view(), name='delete_comment'
-    )
+    ),
+    path('stats/views/', views.ViewStatsView.as_view(), name='view_stats'),
+    path('export/', views.ExportView.as_view(), name='export'),
 ]
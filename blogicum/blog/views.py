@@ -1,36 +1,85 @@
 
 from django.shortcuts import get_object_or_404
 from blog.models import Post, Category, User, Comment
-from django.utils import timezone
 from django.views.generic import (
     DetailView, UpdateView, ListView, CreateView, DeleteView
 )
 from django.urls import reverse, reverse_lazy
-from .forms import FormComment, PostCreationForm, FormUserComment
-from django.db.models import Count
-from .mixin import OnlyAuthorMixin, CommentMixin
+from .forms import (
+    FormComment, PostCreationForm, FormUserComment, ExportForm, SearchForm
+)
+from django.db import transaction
+from .mixin import (
+    OnlyAuthorMixin, CommentMixin, KeysetPaginationMixin,
+    AnonymousPageCacheMixin, CommentPageMixin, ImageRenditionsMixin,
+    ConditionalGetMixin, PostConditionalGetMixin, ElidedPageRangeMixin,
+    CachedCountMixin
+)
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
+from django.utils.decorators import method_decorator
+from django.views import View
+from .bulk import EXPORT_MODELS, export_queryset, iter_csv, iter_jsonl
+from .middleware import view_stats
+from .search import search_posts
+from django.utils.http import urlencode
 
 
 OBJECTS_PER_PAGE = 10
 
 
-class IndexListView(ListView):
+class IndexListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin,
+    CachedCountMixin, ElidedPageRangeMixin, ListView
+):
     """Главная страница"""
 
     model = Post
+    read_replica = True
     template_name = 'blog/index.html'
     paginate_by = OBJECTS_PER_PAGE
-    context_object_name = 'page_obj'
 
     def get_queryset(self):
         return self.model.objects.main_filter()
 
 
-class CategoryPostsListView(ListView):  # DetailView
+class SearchListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, CachedCountMixin,
+    ElidedPageRangeMixin, ListView
+):
+    """Поиск по опубликованным постам"""
+
+    model = Post
+    read_replica = True
+    template_name = 'blog/search.html'
+    paginate_by = OBJECTS_PER_PAGE
+
+    def get_queryset(self):
+        self.form = SearchForm(self.request.GET)
+        self.query = (
+            self.form.cleaned_data['q'] if self.form.is_valid() else ''
+        )
+        return search_posts(self.model.objects.main_filter(), self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['form'] = self.form
+        context['query'] = self.query
+        context['page_query'] = urlencode({'q': self.query}) + '&'
+        return context
+
+
+class CategoryPostsListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, KeysetPaginationMixin,
+    CachedCountMixin, ElidedPageRangeMixin, ListView
+):  # DetailView
     """Вывод постов в категории"""
 
     model = Category
+    read_replica = True
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = OBJECTS_PER_PAGE
@@ -52,38 +101,39 @@ class CategoryPostsListView(ListView):  # DetailView
         return context
 
 
-class PostDetail(DetailView):
+class PostDetail(PostConditionalGetMixin, CommentPageMixin, DetailView):
     """Пост подробнее"""
 
     model = Post
+    read_replica = True
     template_name = 'blog/detail.html'
 
     def get_queryset(self):
-        return super().get_queryset().select_related(
+        return Post.objects.visible_to(self.request.user).select_related(
             'author', 'category', 'location'
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['comments'] = (
-            context['post'].comment.all().select_related('author')
-        )
         context['form'] = FormComment()
         return context
 
-    def get_object(self, queryset=None):
-        post = super().get_object()
-        if post.author == self.request.user:
-            return post
-        return get_object_or_404(
-            self.get_queryset(), is_published=True,
-            category__is_published=True,
-            pub_date__lt=timezone.now(),
-            pk=self.kwargs[self.pk_url_kwarg]
-        )
 
+class PostCommentsView(
+    PostConditionalGetMixin, CommentPageMixin, DetailView
+):
+    """Следующая порция комментариев поста (фрагмент HTML)"""
+
+    model = Post
+    read_replica = True
+    template_name = 'includes/comment_list.html'
+
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
 
-class CreatingNewPostView(LoginRequiredMixin, CreateView):
+
+class CreatingNewPostView(LoginRequiredMixin, ImageRenditionsMixin,
+                          CreateView):
     """Создание нового поста"""
 
     model = Post
@@ -120,7 +170,8 @@ class PostUserDeleteView(LoginRequiredMixin, OnlyAuthorMixin, DeleteView):
         return result
 
 
-class PostUpdateView(LoginRequiredMixin, OnlyAuthorMixin, UpdateView):
+class PostUpdateView(LoginRequiredMixin, OnlyAuthorMixin,
+                     ImageRenditionsMixin, UpdateView):
     """Измененить пост пользователя"""
 
     model = Post
@@ -140,10 +191,14 @@ class PostUpdateView(LoginRequiredMixin, OnlyAuthorMixin, UpdateView):
         )
 
 
-class ProfileDetailView(ListView):
+class ProfileDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, CachedCountMixin,
+    ElidedPageRangeMixin, ListView
+):
     """Просмотреть профиль пользователя"""
 
     model = User
+    read_replica = True
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
     pk_url_kwarg = 'username'
@@ -155,16 +210,17 @@ class ProfileDetailView(ListView):
             username=self.kwargs[self.pk_url_kwarg]
         )
         if self.user == self.request.user:
-            return Post.objects.filter(
-                author=self.user
-            ).select_related(
-                'author', 'category', 'location'
-            ).annotate(comment_count=Count('comment')).order_by('-pub_date')
+            return Post.objects.filter(author=self.user).feed()
         else:
             return Post.objects.main_filter().filter(
                 author=self.user
             )
 
+    def get_count_cache_key(self):
+        # Владелец видит в профиле и неопубликованные посты
+        own = self.request.user.username == self.kwargs[self.pk_url_kwarg]
+        return f'{super().get_count_cache_key()}:{own}'
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.user
@@ -203,7 +259,9 @@ class AddCommentCreateView(LoginRequiredMixin, CreateView):
             category__is_published=True,
             pk=self.kwargs['post_id']
         )
-        return super().form_valid(form)
+        # Счётчик комментариев сдвигает сигнал в той же транзакции
+        with transaction.atomic():
+            return super().form_valid(form)
 
     def get_success_url(self):
         return reverse(
@@ -221,3 +279,39 @@ class CommentDeleteView(
     LoginRequiredMixin, OnlyAuthorMixin, CommentMixin, DeleteView
 ):
     """Удаление коментария"""
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class ViewStatsView(View):
+    """Накопленные метрики представлений (только для персонала)"""
+
+    def get(self, request):
+        return JsonResponse(view_stats.snapshot())
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class ExportView(View):
+    """Потоковая выгрузка постов или комментариев (только для персонала)"""
+
+    content_types = {
+        'jsonl': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def get(self, request):
+        form = ExportForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        data = form.cleaned_data
+        queryset = export_queryset(
+            EXPORT_MODELS[data['model']], data['category'], data['author'],
+            data['since'], data['until']
+        )
+        rows = iter_jsonl if data['format'] == 'jsonl' else iter_csv
+        response = StreamingHttpResponse(
+            rows(queryset), content_type=self.content_types[data['format']]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{data["model"]}s.{data["format"]}"'
+        )
+        return response
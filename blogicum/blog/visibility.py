@@ -0,0 +1,18 @@
+"""Пересчёт Post.is_visible большими порциями.
+
+Снятие с публикации категории меняет видимость всех её постов; посты
+обходятся пачками (см. batches.batched).
+"""
+from django.conf import settings
+
+from .batches import batched
+
+
+def recompute_in_batches(queryset, batch_size=None, on_batch=None):
+    """Пересчитывает is_visible постов queryset; возвращает
+    (просмотрено, изменено). on_batch(processed, changed) — после пачки.
+    """
+    return batched(
+        queryset, 'recompute_visibility',
+        batch_size or settings.BLOG_VISIBILITY_BATCH_SIZE, on_batch
+    )
@@ -0,0 +1,41 @@
+"""Фоновые задачи в пуле потоков процесса.
+
+Подходит для работы, которую не нужно ждать в запросе и не страшно
+потерять при перезапуске: копии изображений, длинные пакетные правки.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BLOG_WORKERS,
+                thread_name_prefix='blog-worker'
+            )
+    return _executor
+
+
+def submit(func, *args, **kwargs):
+    return get_executor().submit(_run, func, *args, **kwargs)
+
+
+def _run(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+    finally:
+        # У потока свои соединения с базой, закрываем их сами
+        connections.close_all()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,11 +38,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ViewMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
@@ -72,10 +75,83 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+# DJANGO_DB_ENGINE=sqlite (по умолчанию) или postgresql.
+# CONN_MAX_AGE держит соединение между запросами (0 — новое на каждый
+# запрос, None — без ограничения); перед переиспользованием соединение
+# проверяется (BLOG_DB_HEALTH_CHECKS, см. blog.db).
+DB_ENGINE = os.getenv('DJANGO_DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'blogicum'),
+            'USER': os.getenv('POSTGRES_USER', 'blogicum'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DJANGO_DB_CONN_MAX_AGE', 60)),
+            # Пул PgBouncer в режиме transaction не держит курсоры
+            # между транзакциями
+            'DISABLE_SERVER_SIDE_CURSORS': bool(
+                os.getenv('DJANGO_DB_PGBOUNCER')
+            ),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv('DJANGO_DB_CONN_MAX_AGE', 0)),
+        }
+    }
+
+# PRAGMA для каждого нового соединения SQLite: WAL не даёт записи
+# блокировать чтение, NORMAL безопасен в режиме WAL
+BLOG_SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('DJANGO_SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('DJANGO_SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -16000,
+    'temp_store': 'memory',
+    'foreign_keys': 'on',
+}
+BLOG_DB_HEALTH_CHECKS = True
+
+# Реплики только для чтения: DJANGO_DB_REPLICAS — через запятую пути
+# к SQLite-копиям (их обновляет manage.py sync_replicas) или host[:port]
+# серверов PostgreSQL. В тестах реплики зеркалят тестовую default.
+BLOG_READ_REPLICAS = []
+for number, location in enumerate(
+    filter(None, os.getenv('DJANGO_DB_REPLICAS', '').split(',')), start=1
+):
+    replica = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if DB_ENGINE == 'postgresql':
+        host, _, port = location.strip().partition(':')
+        replica.update(HOST=host, PORT=port or replica['PORT'])
+    else:
+        replica['NAME'] = location.strip()
+    DATABASES[f'replica_{number}'] = replica
+    BLOG_READ_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи пользователь читает только из default
+BLOG_REPLICA_PIN_SECONDS = 10
+
+
+# Cache
+# Для нескольких процессов нужен общий бэкенд (например, memcached),
+# иначе сброс кэша лент не дойдёт до соседних воркеров.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', ''),
     }
 }
 
@@ -146,3 +222,48 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # Директория для щагрузки файлов
 MEDIA_URL = 'media/'
+
+# Курсорная пагинация ленты по умолчанию (иначе только по ?cursor=)
+BLOG_KEYSET_PAGINATION = False
+
+# Сколько секунд хранить страницы лент для гостей (0 — не кэшировать)
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Как часто перечитывать из базы момент ближайшей отложенной публикации
+BLOG_SCHEDULE_RECHECK_TIMEOUT = 60 * 60
+
+# Сколько комментариев показывать на странице поста за раз
+BLOG_COMMENTS_PER_PAGE = 20
+
+# Метрики представлений: заголовок Server-Timing и /stats/views/
+BLOG_VIEW_METRICS = True
+# Сколько последних запросов каждого представления держать для перцентилей
+BLOG_VIEW_METRICS_WINDOW = 1000
+
+# Потоки для фоновых задач (blog.workers)
+BLOG_WORKERS = 2
+# Обработка изображений постов: 'thread' — в пуле потоков после коммита,
+# 'sync' — сразу после коммита в том же процессе, 'off' — не обрабатывать
+BLOG_IMAGE_PIPELINE = os.getenv('BLOG_IMAGE_PIPELINE', 'thread')
+# Ширины уменьшенных копий; оригинал сохраняется ещё и в сжатом JPEG
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+# Ширина изображения в карточке ленты (40rem) и атрибут sizes для srcset
+BLOG_CARD_IMAGE_WIDTH = 640
+BLOG_CARD_IMAGE_SIZES = '(max-width: 640px) 100vw, 640px'
+
+# Сколько строк админка считает точно; дальше — оценка (см. paginators)
+BLOG_ADMIN_COUNT_LIMIT = 10000
+
+# Пакетная публикация в админке: размер пачки и порог, после которого
+# операция уходит в фоновый поток
+BLOG_PUBLISH_BATCH_SIZE = 1000
+BLOG_PUBLISH_SYNC_LIMIT = 20000
+
+# Число постов лент кэшируется до первой правки; с какого размера
+# выборки на PostgreSQL брать оценку планировщика вместо COUNT
+# (None — всегда считать точно)
+BLOG_FEED_COUNT_TIMEOUT = 600
+BLOG_FEED_APPROX_COUNT_FROM = None
+
+# Пачка пересчёта Post.is_visible при смене публикации категории
+BLOG_VISIBILITY_BATCH_SIZE = 1000
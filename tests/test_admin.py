@@ -0,0 +1,138 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Post
+from blog.paginators import EstimatedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category
+    )
+
+
+def test_estimated_count(many_posts, settings):
+    settings.BLOG_ADMIN_COUNT_LIMIT = 2
+    max_pk = max(post.pk for post in many_posts)
+    paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+    assert paginator.count == max_pk, (
+        'Убедитесь, что без фильтров число постов в админке оценивается '
+        'без COUNT(*) по всей таблице.'
+    )
+    filtered = EstimatedCountPaginator(Post.objects.filter(pk__gt=0), 10)
+    assert filtered.count == 2
+
+    settings.BLOG_ADMIN_COUNT_LIMIT = 100
+    assert EstimatedCountPaginator(Post.objects.all(), 10).count == 5
+
+
+def test_post_changelist_search(admin_client, many_posts):
+    post = many_posts[0]
+    Post.objects.filter(pk=post.pk).update(title='Уникальный заголовок')
+    response = admin_client.get(
+        '/admin/blog/post/', {'q': 'уникальный'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert [p.pk for p in response.context['cl'].result_list] == [post.pk]
+
+
+def test_comment_changelist_queries(
+        admin_client, mixer, post_with_published_location,
+        django_assert_max_num_queries
+):
+    mixer.cycle(10).blend('blog.Comment', post=post_with_published_location)
+    admin_client.get('/admin/blog/comment/')
+    with django_assert_max_num_queries(8):
+        response = admin_client.get('/admin/blog/comment/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что список комментариев в админке не делает запрос '
+        'на каждую строку.'
+    )
+
+
+def test_post_change_form_has_no_full_selects(admin_client, many_posts):
+    response = admin_client.get(f'/admin/blog/post/{many_posts[0].pk}/change/')
+    assert response.status_code == HTTPStatus.OK
+    assert 'admin-autocomplete' in response.content.decode('utf-8')
+
+
+def unpublish_all(admin_client, posts):
+    return admin_client.post('/admin/blog/post/', {
+        'action': 'off_published',
+        '_selected_action': [post.pk for post in posts],
+    })
+
+
+def test_publish_action_in_batches(admin_client, many_posts, settings):
+    from django.contrib.admin.models import LogEntry
+
+    settings.BLOG_PUBLISH_BATCH_SIZE = 2
+    Post.objects.update(is_published=True)
+    response = unpublish_all(admin_client, many_posts)
+    assert response.status_code == HTTPStatus.FOUND
+    assert not Post.objects.filter(is_published=True).exists()
+    assert LogEntry.objects.filter(
+        object_id__in=[str(post.pk) for post in many_posts]
+    ).count() == len(many_posts), (
+        'Убедитесь, что пакетное снятие с публикации пишет журнал админки.'
+    )
+
+
+def test_set_published_reports_progress(many_posts):
+    from blog.publishing import set_published
+
+    Post.objects.update(is_published=False)
+    progress = []
+    done = set_published(
+        Post.objects.all(), True, None, batch_size=2,
+        on_batch=progress.append
+    )
+    assert done == len(many_posts)
+    assert progress == [2, 4, 5]
+    assert set_published(Post.objects.all(), True, None) == 0
+
+
+def test_big_publish_runs_in_background(
+        admin_client, many_posts, settings, monkeypatch,
+        django_capture_on_commit_callbacks
+):
+    from blog import workers
+
+    settings.BLOG_PUBLISH_SYNC_LIMIT = 1
+    monkeypatch.setattr(
+        workers, 'submit', lambda func, *args: func(*args)
+    )
+    Post.objects.update(is_published=True)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        unpublish_all(admin_client, many_posts)
+    assert callbacks
+    assert not Post.objects.filter(is_published=True).exists()
+
+
+def test_user_changelist_counts_and_filters(
+        admin_client, mixer, user, another_user, many_posts,
+        django_assert_max_num_queries
+):
+    mixer.cycle(3).blend('blog.Comment', author=user, post=many_posts[0])
+    with django_assert_max_num_queries(8):
+        response = admin_client.get('/admin/auth/user/')
+    rows = {u.username: u for u in response.context['cl'].result_list}
+    assert (rows[user.username].post_count,
+            rows[user.username].comment_count) == (5, 3), (
+        'Убедитесь, что в списке пользователей выводится число их постов '
+        'и комментариев.'
+    )
+
+    def usernames(**params):
+        response = admin_client.get('/admin/auth/user/', params)
+        return {u.username for u in response.context['cl'].result_list}
+
+    assert usernames(has_posts='yes') == {user.username}
+    assert another_user.username in usernames(has_posts='no')
+    assert usernames(post_count='1-9') == {user.username}
+    assert usernames(post_count='10-99') == set()
+    assert usernames(active_within='7') == {user.username}
@@ -0,0 +1,110 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import bulk
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+RECORDS = [
+    {'model': 'auth.user', 'pk': 900, 'fields': {
+        'username': 'loaded_author', 'password': '!',
+        'date_joined': '2022-12-18T22:57:29Z', 'groups': [],
+    }},
+    {'model': 'blog.category', 'pk': 900, 'fields': {
+        'title': 'Загруженная', 'description': '...', 'slug': 'loaded',
+        'is_published': True, 'created_at': '2022-12-18T23:03:52Z',
+    }},
+    {'model': 'blog.location', 'pk': 900, 'fields': {'name': 'Место'}},
+    {'model': 'blog.post', 'pk': 900, 'fields': {
+        'title': 'Загруженный пост', 'text': 'Текст',
+        'pub_date': '2020-01-01T00:00:00Z',
+        'created_at': '2021-01-01T00:00:00Z',
+        'author': ['loaded_author'], 'category': ['loaded'],
+        'location': 900,
+    }},
+    {'model': 'blog.comment', 'fields': {
+        'text': 'Комментарий', 'author': 900, 'post': 900,
+    }},
+    {'model': 'sessions.session', 'pk': 'x', 'fields': {}},
+]
+
+
+@pytest.fixture(params=['array', 'lines'])
+def fixture_file(request, tmp_path, monkeypatch):
+    # Маленькие куски чтения проверяют разбор на границах буфера
+    monkeypatch.setattr(bulk, 'READ_CHUNK', 7)
+    path = tmp_path / 'fixture.json'
+    if request.param == 'array':
+        path.write_text(json.dumps(RECORDS, ensure_ascii=False, indent=1))
+    else:
+        path.write_text('\n'.join(
+            json.dumps(record, ensure_ascii=False) for record in RECORDS
+        ))
+    return path
+
+
+def test_bulk_load(fixture_file):
+    call_command('bulk_load', str(fixture_file), batch_size=2,
+                 stdout=StringIO())
+    post = Post.objects.get(pk=900)
+    assert post.author.username == 'loaded_author'
+    assert post.category.slug == 'loaded'
+    assert post.created_at.year == 2021, (
+        'Убедитесь, что даты из фикстуры не перезаписываются auto_now_add.'
+    )
+    assert post.comment_count == 1
+    assert Comment.objects.get().post_id == 900
+
+
+def test_bulk_load_comments_only(tmp_path, post_with_published_location,
+                                 user):
+    post = post_with_published_location
+    path = tmp_path / 'comments.jsonl'
+    path.write_text('\n'.join(
+        json.dumps({'model': 'blog.comment', 'fields': {
+            'text': f'Комментарий {i}', 'author': user.pk, 'post': post.pk,
+        }}, ensure_ascii=False) for i in range(3)
+    ))
+    call_command('bulk_load', str(path), stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что после загрузки одних комментариев счётчики '
+        'комментариев пересчитываются.'
+    )
+
+
+def test_bulk_load_refreshes_posts_per_batch(
+        post_with_published_location, user
+):
+    post = post_with_published_location
+    loader = bulk.BulkLoader(batch_size=2)
+    with CaptureQueriesContext(connection) as captured:
+        for i in range(3):
+            loader.add({'model': 'blog.comment', 'fields': {
+                'text': f'Комментарий {i}', 'author': user.pk,
+                'post': post.pk,
+            }})
+        post.refresh_from_db()
+        assert post.comment_count == 2, (
+            'Убедитесь, что счётчики пересчитываются после каждой пачки.'
+        )
+        assert not any(loader.touched.values()), (
+            'Убедитесь, что загрузчик не копит pk постов до конца загрузки.'
+        )
+        loader.finish()
+    post.refresh_from_db()
+    assert post.comment_count == 3
+    updates = [
+        q['sql'] for q in captured
+        if q['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert updates and all(' IN (' in sql for sql in updates), (
+        'Убедитесь, что после загрузки пересчитываются только '
+        'затронутые посты.'
+    )
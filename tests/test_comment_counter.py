@@ -0,0 +1,94 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при добавлении комментария увеличивается '
+        'счётчик комментариев поста.'
+    )
+
+    comment = post.comment.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        'счётчик комментариев поста.'
+    )
+
+
+def test_comment_count_follows_any_write(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    commenter = mixer.blend('auth.User')
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    mixer.blend('blog.Comment', post=post, author=commenter)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что счётчик учитывает комментарии, созданные не '
+        'через представления.'
+    )
+    # Каскадное удаление комментариев вместе с автором
+    commenter.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_comment_moved_to_another_post(mixer, post_with_published_location):
+    post = post_with_published_location
+    other = mixer.blend('blog.Post', category=post.category)
+    comment = mixer.blend('blog.Comment', post=post)
+    comment.post = other
+    comment.save()
+    assert Post.objects.get(pk=post.pk).comment_count == 0, (
+        'Убедитесь, что перенос комментария к другому посту уменьшает '
+        'счётчик старого поста.'
+    )
+    assert Post.objects.get(pk=other.pk).comment_count == 1
+
+
+def test_post_delete_cascades_comments_in_one_query(
+        mixer, post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    mixer.cycle(50).blend('blog.Comment', post=post)
+    # DELETE комментариев одним запросом и DELETE поста; запросы
+    # не растут с числом комментариев
+    with django_assert_num_queries(2):
+        post.delete()
+
+
+def test_bulk_comment_delete_shifts_counters_per_post(
+        mixer, post_with_published_location, django_assert_max_num_queries
+):
+    post = post_with_published_location
+    other = mixer.blend('blog.Post', category=post.category)
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    mixer.cycle(5).blend('blog.Comment', post=other)
+    with django_assert_max_num_queries(5):
+        Comment.objects.all().delete()
+    assert Post.objects.get(pk=post.pk).comment_count == 0
+    assert Post.objects.get(pk=other.pk).comment_count == 0
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
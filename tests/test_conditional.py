@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def revalidate(client, url, response, **extra):
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **extra)
+
+
+def test_feed_not_modified_without_queries(
+        client, post_with_published_location, django_assert_num_queries
+):
+    response = client.get('/')
+    assert response.has_header('ETag')
+    with django_assert_num_queries(0):
+        repeated = revalidate(client, '/', response)
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что лента отвечает 304 на If-None-Match с актуальным '
+        'ETag, не обращаясь к базе.'
+    )
+
+    post = post_with_published_location
+    post.title = 'Новый заголовок'
+    post.save()
+    assert revalidate(client, '/', response).status_code == HTTPStatus.OK
+
+
+def test_feed_etag_depends_on_user(
+        client, user_client, post_with_published_location
+):
+    response = client.get('/')
+    assert revalidate(user_client, '/', response).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_post_detail_validators(
+        client, user_client, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    response = client.get(url)
+    assert response.has_header('Last-Modified')
+    with django_assert_num_queries(1):
+        assert revalidate(client, url, response).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        )
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+    user_client.post(f'{url}comment/', {'text': 'Комментарий'})
+    changed = revalidate(client, url, response)
+    assert changed.status_code == HTTPStatus.OK
+
+    comment = post.comment.get()
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    assert revalidate(client, url, changed).status_code == HTTPStatus.OK, (
+        'Убедитесь, что правка комментария меняет ETag страницы поста.'
+    )
+
+
+def test_post_detail_revalidated_after_relogin(
+        client, user, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    client.force_login(user)
+    response = client.get(url)
+    assert not response.has_header('Last-Modified')
+    client.logout()
+    client.force_login(user)
+    assert revalidate(client, url, response).status_code == HTTPStatus.OK, (
+        'Убедитесь, что после повторного входа страница поста с формой '
+        'комментария приходит заново, с новым CSRF-токеном.'
+    )
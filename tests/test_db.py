@@ -0,0 +1,42 @@
+import pytest
+from django.db import connection
+
+from blog.db import apply_sqlite_pragmas, mark_persistent_connections
+from blog.models import Post
+from blog.routers import PrimaryReplicaRouter
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='только SQLite')
+def test_sqlite_pragmas(settings):
+    settings.BLOG_SQLITE_PRAGMAS = {'busy_timeout': 1234}
+    apply_sqlite_pragmas(sender=None, connection=connection)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == 1234, (
+            'Убедитесь, что PRAGMA из BLOG_SQLITE_PRAGMAS применяются к '
+            'соединению SQLite.'
+        )
+
+
+def test_health_check_on_first_use(monkeypatch):
+    pings = []
+    connection.ensure_connection()
+    monkeypatch.setitem(connection.settings_dict, 'CONN_MAX_AGE', 60)
+    # Тест идёт внутри транзакции, а в ней соединение не проверяется
+    monkeypatch.setattr(connection, 'in_atomic_block', False)
+    monkeypatch.setattr(connection, 'is_usable', lambda: pings.append(1) or 1)
+
+    mark_persistent_connections()
+    assert not pings, (
+        'Убедитесь, что в начале запроса соединения не проверяются '
+        'запросом к базе.'
+    )
+    router = PrimaryReplicaRouter()
+    router.db_for_read(Post)
+    router.db_for_write(Post)
+    assert pings == [1], (
+        'Убедитесь, что соединение проверяется один раз, при первом '
+        'обращении запроса к алиасу.'
+    )
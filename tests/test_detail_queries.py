@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog import schedule
+
+pytestmark = [pytest.mark.django_db]
+
+# Пост с автором, категорией и местом + комментарии с авторами
+DETAIL_QUERY_BUDGET = 2
+# Для авторизованного добавляются сессия и пользователь
+DETAIL_QUERY_BUDGET_LOGGED_IN = DETAIL_QUERY_BUDGET + 2
+
+
+@pytest.fixture
+def post_with_comments(mixer, post_with_published_location):
+    mixer.cycle(5).blend('blog.Comment', post=post_with_published_location)
+    # Момент ближайшей публикации кэшируется и читается из базы не чаще
+    # раза за BLOG_SCHEDULE_RECHECK_TIMEOUT, в бюджет запроса не входит
+    schedule.next_publication()
+    return post_with_published_location
+
+
+def test_detail_query_budget(
+        client, post_with_comments, django_assert_num_queries
+):
+    with django_assert_num_queries(DETAIL_QUERY_BUDGET):
+        response = client.get(f'/posts/{post_with_comments.id}/')
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['comments']) == 5
+
+
+def test_detail_query_budget_logged_in(
+        another_user_client, post_with_comments, django_assert_num_queries
+):
+    with django_assert_num_queries(DETAIL_QUERY_BUDGET_LOGGED_IN):
+        response = another_user_client.get(f'/posts/{post_with_comments.id}/')
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_hidden_post_visible_only_to_author(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/'
+    assert user_client.get(url).status_code == HTTPStatus.OK
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_detail_comments_are_paginated(
+        client, mixer, post_with_published_location, settings
+):
+    post = post_with_published_location
+    per_page = settings.BLOG_COMMENTS_PER_PAGE
+    comments = mixer.cycle(per_page + 5).blend('blog.Comment', post=post)
+    response = client.get(f'/posts/{post.id}/')
+    page = response.context['comments']
+    assert [c.id for c in page] == [c.id for c in comments[:per_page]], (
+        'Убедитесь, что на странице поста выводится первая порция '
+        'комментариев, «от старых к новым».'
+    )
+    assert page.has_next()
+
+    fragment = client.get(
+        f'/posts/{post.id}/comments/', {'cursor': page.next_cursor}
+    )
+    assert fragment.status_code == HTTPStatus.OK
+    rest = fragment.context['comments']
+    assert [c.id for c in rest] == [c.id for c in comments[per_page:]]
+    assert not rest.has_next()
+
+
+def test_comments_fragment_respects_post_visibility(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template.defaultfilters import truncatewords
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(50))
+
+
+def test_excerpt_built_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        'Убедитесь, что при сохранении поста анонс строится так же, '
+        'как фильтр truncatewords:10.'
+    )
+
+    post.text = 'Короткий текст'
+    post.save(update_fields=['text'])
+    post.refresh_from_db()
+    assert post.excerpt == 'Короткий текст'
+
+    Post.objects.filter(pk=post.pk).update(text=LONG_TEXT)
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10)
+
+
+def test_feed_defers_text(client, post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    response = client.get('/')
+    feed_post = response.context['page_obj'][0]
+    assert 'text' in feed_post.get_deferred_fields(), (
+        'Убедитесь, что лента не читает полный текст постов.'
+    )
+    assert truncatewords(LONG_TEXT, 10) in response.content.decode('utf-8')
+    assert 'слово20' not in response.content.decode('utf-8')
+
+
+def test_backfill_excerpts_command(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt='')
+    call_command('backfill_excerpts', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(post.text, 10)
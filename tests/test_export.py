@@ -0,0 +1,46 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_export_command_jsonl(
+        post_with_published_location, post_with_another_category,
+        published_category
+):
+    out = StringIO()
+    call_command('export_content', category=published_category.slug,
+                 stdout=out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [record['pk'] for record in records] == [
+        post_with_published_location.pk
+    ]
+    assert records[0]['model'] == 'blog.post'
+    assert records[0]['fields']['title'] == post_with_published_location.title
+
+
+def test_export_view_csv(admin_client, comment_to_a_post):
+    response = admin_client.get('/export/', {
+        'model': 'comment', 'format': 'csv'
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming
+    rows = list(csv.reader(
+        b''.join(response.streaming_content).decode().splitlines()
+    ))
+    assert rows[0][0] == 'id'
+    assert rows[1][0] == str(comment_to_a_post.pk)
+
+
+def test_export_view_bad_params(admin_client):
+    response = admin_client.get('/export/', {'since': 'вчера'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_export_view_staff_only(user_client):
+    assert user_client.get('/export/').status_code == HTTPStatus.FOUND
@@ -0,0 +1,86 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog.images import build_renditions, delete_renditions
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(size=(1500, 1000)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(
+        'big.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def test_build_renditions(settings):
+    name = default_storage.save('post_images/big.jpg', make_image())
+    renditions = build_renditions(name)
+    assert (renditions['width'], renditions['height']) == (1500, 1000)
+    assert [v['width'] for v in renditions['variants']] == [
+        *[w for w in settings.BLOG_IMAGE_WIDTHS if w < 1500], 1500
+    ], 'Убедитесь, что копии строятся без увеличения оригинала.'
+    for variant in renditions['variants']:
+        with default_storage.open(variant['name']) as f:
+            assert Image.open(f).size == (variant['width'], variant['height'])
+    delete_renditions(renditions)
+    default_storage.delete(name)
+
+
+def test_new_image_processed_after_commit(
+        user, user_client, published_category, settings,
+        django_capture_on_commit_callbacks
+):
+    settings.BLOG_IMAGE_PIPELINE = 'sync'
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        user_client.post('/posts/create/', {
+            'title': 'С картинкой', 'text': 'Текст',
+            'pub_date': '2020-01-01 10:00', 'category': published_category.id,
+            'image': make_image(),
+        })
+    assert callbacks, (
+        'Убедитесь, что обработка изображения откладывается до коммита.'
+    )
+    post = Post.objects.get(title='С картинкой')
+    variants = post.image_renditions['variants']
+    assert post.thumbnail_url == default_storage.url(
+        next(v for v in variants if v['width'] >= 640)['name']
+    ), 'Убедитесь, что карточка поста использует уменьшенную копию.'
+    delete_renditions(post.image_renditions)
+
+
+def test_thumbnail_falls_back_to_original(post_with_published_location):
+    post = post_with_published_location
+    assert post.image_renditions == {}
+    assert post.thumbnail_url == post.image.url
+
+
+def test_post_image_tag_renders_srcset(mixer, user, published_category):
+    from blog.templatetags.blog_images import post_image
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image='post_images/big.jpg', image_renditions={
+            'width': 1500, 'height': 1000, 'variants': [
+                {'width': 320, 'height': 213, 'name': 'r/big_320w.jpg'},
+                {'width': 1500, 'height': 1000, 'name': 'r/big_1500w.jpg'},
+            ]
+        }
+    )
+    html = post_image(post)
+    assert 'r/big_320w.jpg 320w, /media/r/big_1500w.jpg 1500w' in html, (
+        'Убедитесь, что в srcset перечислены все готовые копии.'
+    )
+    assert 'width="1500" height="1000"' in html
+    assert 'loading="lazy"' in html
+    assert 'loading="eager"' in post_image(post, eager=True)
+
+    post.image_renditions = {}
+    html = post_image(post)
+    assert 'srcset' not in html and 'width=' not in html
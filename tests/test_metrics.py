@@ -0,0 +1,29 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.middleware import view_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    response = user_client.get('/')
+    timing = response['Server-Timing']
+    for metric in ('db;dur=', 'queries', 'tpl;dur=', 'total;dur='):
+        assert metric in timing
+
+
+def test_view_stats_endpoint(admin_client, post_with_published_location):
+    view_stats.reset()
+    admin_client.get('/')
+    admin_client.get(f'/posts/{post_with_published_location.id}/')
+    stats = admin_client.get('/stats/views/').json()
+    assert stats['blog:index']['requests'] == 1
+    assert stats['blog:post_detail']['avg_queries'] > 0
+    assert stats['blog:index']['p99_ms'] >= stats['blog:index']['p50_ms']
+
+
+def test_view_stats_endpoint_staff_only(user_client):
+    response = user_client.get('/stats/views/')
+    assert response.status_code == HTTPStatus.FOUND
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from blog.views import IndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_feed_is_served_from_cache(
+        client, post_with_published_location, django_assert_num_queries
+):
+    first = client.get('/').content
+    with django_assert_num_queries(0):
+        second = client.get('/').content
+    assert first == second, (
+        'Убедитесь, что повторный запрос гостя к ленте отдаётся из кэша.'
+    )
+
+
+def test_anonymous_feed_cache_invalidated_by_writes(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    client.get('/')
+    post.title = 'Заголовок после правки'
+    post.save()
+    assert 'Заголовок после правки' in client.get('/').content.decode(
+        'utf-8'
+    ), 'Убедитесь, что изменение поста сбрасывает кэш страниц лент.'
+
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    assert 'Заголовок после правки' not in client.get('/').content.decode(
+        'utf-8'
+    ), 'Убедитесь, что снятие с публикации сбрасывает кэш страниц лент.'
+
+
+def test_logged_in_user_bypasses_page_cache(
+        user_client, post_with_published_location
+):
+    user_client.get('/')
+    response = user_client.get('/')
+    assert response.context is not None
+
+
+def test_page_cache_timeout_bounded_by_scheduled_post(mixer, user):
+    mixer.blend(
+        'blog.Post', author=user, pub_date=timezone.now() + timedelta(
+            seconds=30
+        )
+    )
+    assert IndexListView().get_page_cache_timeout() <= 30
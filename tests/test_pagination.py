@@ -0,0 +1,151 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    seen = []
+    response = client.get(url, {'cursor': ''})
+    assert response.status_code == HTTPStatus.OK
+    page = response.context['page_obj']
+    seen.append([post.id for post in page])
+    while page.has_next():
+        response = client.get(url, {'cursor': page.next_cursor})
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['page_obj']
+        seen.append([post.id for post in page])
+    return seen
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category'])
+def test_cursor_pagination_walks_whole_feed(
+        user_client, many_posts_with_published_locations, published_category,
+        url_name
+):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+    }[url_name]
+    pages = _walk_cursor_pages(user_client, url)
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+    ids = [post_id for page in pages for post_id in page]
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    assert ids == [post.id for post in expected], (
+        'Убедитесь, что курсорная пагинация проходит ленту целиком, '
+        'без пропусков и повторов, «от новых к старым».'
+    )
+
+
+def test_cursor_pagination_previous_page(
+        user_client, many_posts_with_published_locations
+):
+    first = user_client.get('/', {'cursor': ''}).context['page_obj']
+    second = user_client.get(
+        '/', {'cursor': first.next_cursor}
+    ).context['page_obj']
+    assert second.has_previous()
+    back = user_client.get(
+        '/', {'cursor': second.previous_cursor}
+    ).context['page_obj']
+    assert [post.id for post in back] == [post.id for post in first]
+    assert not back.has_previous()
+
+
+def test_cursor_pagination_invalid_cursor(user_client):
+    response = user_client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def _render_paginator(total_items, number):
+    from django.core.paginator import Paginator
+    from django.template.loader import render_to_string
+
+    page = Paginator(range(total_items), N_PER_PAGE).page(number)
+    started = time.perf_counter()
+    html = render_to_string('includes/paginator.html', {
+        'page_obj': page,
+        'page_range': page.paginator.get_elided_page_range(
+            number, on_each_side=2, on_ends=1
+        ),
+    })
+    return html, time.perf_counter() - started
+
+
+def test_paginator_is_windowed():
+    small, small_time = _render_paginator(N_PER_PAGE * 50, 25)
+    huge, huge_time = _render_paginator(N_PER_PAGE * 500_000, 250_000)
+    assert small.count('<li') == huge.count('<li'), (
+        'Убедитесь, что пагинатор выводит окно страниц вокруг текущей, '
+        'а не все номера страниц.'
+    )
+    assert '250002' in huge and '249998' in huge and '500000' in huge
+    # Полный page_range на 500 000 страниц рендерился бы секунды
+    assert huge_time < max(small_time * 20, 0.05)
+
+
+def test_index_exposes_page_and_window(
+        user_client, many_posts_with_published_locations
+):
+    response = user_client.get('/')
+    page = response.context['page_obj']
+    assert page.number == 1 and page.has_next(), (
+        'Убедитесь, что на главной в page_obj передаётся страница '
+        'пагинатора, а не список постов.'
+    )
+    assert list(response.context['page_range'])[0] == 1
+    assert 'href="?page=2"' in response.content.decode('utf-8')
+
+
+def test_feed_count_is_cached_until_write(
+        user_client, mixer, many_posts_with_published_locations,
+        published_category, user
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+
+    first = user_client.get('/').context['page_obj'].paginator.count
+    with CaptureQueriesContext(connection) as captured:
+        page = user_client.get('/', {'page': 2}).context['page_obj']
+    assert page.paginator.count == first
+    assert not any('COUNT(' in q['sql'] for q in captured), (
+        'Убедитесь, что число постов ленты берётся из кэша.'
+    )
+
+    post = many_posts_with_published_locations[0]
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    with CaptureQueriesContext(connection) as captured:
+        user_client.get('/', {'page': 2})
+    assert not any('COUNT(' in q['sql'] for q in captured), (
+        'Убедитесь, что новый комментарий не сбрасывает закэшированное '
+        'число постов ленты.'
+    )
+
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now()
+    )
+    count = user_client.get('/').context['page_obj'].paginator.count
+    assert count == first + 1, (
+        'Убедитесь, что новый пост сбрасывает закэшированное число постов.'
+    )
+
+
+def test_own_profile_count_separate(
+        user_client, client, user, mixer, published_category
+):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False
+    )
+    url = f'/profile/{user.username}/'
+    assert user_client.get(url).context['page_obj'].paginator.count == 1
+    assert client.get(url).context['page_obj'].paginator.count == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_follows_post_changes(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get('/').content.decode('utf-8')
+
+    post.title = 'Новый заголовок поста'
+    post.save()
+    assert 'Новый заголовок поста' in user_client.get('/').content.decode(
+        'utf-8'
+    ), 'Убедитесь, что карточка поста обновляется после его изменения.'
+
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    assert 'Комментарии (7)' in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что update() по постам сбрасывает кэш карточек.'
+    )
+
+    post.title = 'Заголовок через update_fields'
+    post.save(update_fields=['title'])
+    assert 'Заголовок через update_fields' in user_client.get(
+        '/'
+    ).content.decode('utf-8'), (
+        'Убедитесь, что save(update_fields=...) обновляет метку версии '
+        'карточки.'
+    )
+
+
+def test_post_card_follows_category_changes(
+        user_client, post_with_published_location, published_category
+):
+    user_client.get('/')
+    published_category.title = 'Переименованная'
+    published_category.save()
+    assert 'Переименованная' in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что карточки постов обновляются после изменения '
+        'категории.'
+    )
@@ -0,0 +1,84 @@
+import pytest
+from django.core.cache import cache
+
+from blog import routers, schedule
+from blog.cache import NEXT_PUBLICATION_KEY
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica_reads(settings, monkeypatch):
+    """Реплика-«шпион»: запросы идут в тестовую default"""
+    settings.BLOG_READ_REPLICAS = ['replica_1']
+    reads = []
+
+    def choose_replica():
+        reads.append('replica_1')
+        return 'default'
+
+    monkeypatch.setattr(routers, 'choose_replica', choose_replica)
+    return reads
+
+
+def test_feeds_read_from_replica(user_client, client,
+                                 post_with_published_location, replica_reads):
+    response = user_client.get('/')
+    assert replica_reads, 'Убедитесь, что лента читается с реплики.'
+    assert not response.has_header('ETag'), (
+        'Убедитесь, что ответ, прочитанный с реплики, не получает ETag '
+        'текущего поколения лент.'
+    )
+    replica_reads.clear()
+    client.get(f'/posts/{post_with_published_location.id}/')
+    assert replica_reads
+
+
+def test_page_cache_filled_from_primary(client, post_with_published_location,
+                                        replica_reads):
+    response = client.get('/')
+    assert not replica_reads, (
+        'Убедитесь, что страница для общего кэша гостей строится по '
+        'основной базе, а не по отстающей реплике.'
+    )
+    assert response.has_header('ETag')
+
+
+def test_router_writes_to_primary(replica_reads):
+    router = routers.PrimaryReplicaRouter()
+    with routers.replica_reads():
+        assert router.db_for_write(Post) == 'default'
+        router.db_for_read(Post)
+    assert router.db_for_read(Post) == 'default'
+    assert replica_reads == ['replica_1']
+
+
+def test_author_reads_own_writes_from_primary(
+        user_client, another_user_client, post_with_published_location,
+        replica_reads
+):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/edit/', {
+        'title': 'Правка', 'text': post.text,
+        'pub_date': post.pub_date.strftime('%Y-%m-%d %H:%M'),
+        'category': post.category_id,
+    })
+    assert Post.objects.get(pk=post.pk).title == 'Правка'
+    replica_reads.clear()
+    user_client.get(f'/posts/{post.id}/')
+    assert not replica_reads, (
+        'Убедитесь, что автор сразу после правки читает из основной базы.'
+    )
+    another_user_client.get(f'/posts/{post.id}/')
+    assert replica_reads
+
+
+def test_next_publication_read_from_primary(replica_reads):
+    cache.delete(NEXT_PUBLICATION_KEY)
+    with routers.replica_reads():
+        schedule.next_publication()
+    assert not replica_reads, (
+        'Убедитесь, что момент ближайшей публикации читается из основной '
+        'базы: ответ отстающей реплики кэшировался бы надолго.'
+    )
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog import schedule
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Отложенный пост', pub_date=timezone.now() + timedelta(hours=1)
+    )
+
+
+def test_next_publication(scheduled_post):
+    assert schedule.next_publication() == scheduled_post.pub_date
+    assert 0 < schedule.cap_timeout(24 * 60 * 60) <= 60 * 60
+
+
+def test_nothing_scheduled(post_with_published_location):
+    assert schedule.next_publication() is None
+    assert schedule.cap_timeout(300) == 300
+
+
+def test_cached_feed_shows_post_when_its_time_comes(
+        client, monkeypatch, scheduled_post
+):
+    assert 'Отложенный пост' not in client.get('/').content.decode('utf-8')
+
+    later = timezone.now() + timedelta(hours=2)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+    assert 'Отложенный пост' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что отложенный пост появляется в закэшированной ленте, '
+        'как только наступает время его публикации.'
+    )
+
+
+def test_overdue_post_published_after_cache_reset(
+        client, monkeypatch, scheduled_post, mixer
+):
+    later = timezone.now() + timedelta(hours=2)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+    # Запись сбрасывает закэшированный момент ближайшей публикации
+    mixer.blend('blog.Comment', post=scheduled_post)
+    assert schedule.next_publication() == scheduled_post.pub_date, (
+        'Убедитесь, что просроченный отложенный пост всё ещё считается '
+        'ближайшей публикацией.'
+    )
+    assert client.get(f'/posts/{scheduled_post.id}/').status_code == 200, (
+        'Убедитесь, что страница поста открывается, как только наступило '
+        'время публикации, без запроса к ленте.'
+    )
+    assert 'Отложенный пост' in client.get('/').content.decode('utf-8')
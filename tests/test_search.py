@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def search_posts(mixer, user, published_category):
+    def make(title, text='', **kwargs):
+        kwargs.setdefault('is_published', True)
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            pub_date=timezone.now(), title=title, text=text, **kwargs
+        )
+    return make
+
+
+def found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == HTTPStatus.OK
+    return [post.title for post in response.context['page_obj']]
+
+
+def test_search_ranks_title_matches_first(client, search_posts):
+    search_posts('Про котов', 'Текст без нужного слова')
+    search_posts('Заметка', 'Немного о котах и кошках')
+    search_posts('Про собак', 'Ничего общего')
+    assert found(client, 'кот') == ['Про котов', 'Заметка'], (
+        'Убедитесь, что поиск находит посты по заголовку и тексту и '
+        'ставит совпадения в заголовке выше.'
+    )
+
+
+def test_search_index_follows_changes(client, search_posts):
+    post = search_posts('Старый заголовок')
+    post.title = 'Новый заголовок'
+    post.save()
+    assert found(client, 'Новый') == ['Новый заголовок']
+    assert found(client, 'Старый') == []
+
+    Post.objects.filter(pk=post.pk).update(title='Обновлённый')
+    assert found(client, 'Обновлённый') == ['Обновлённый']
+    post.delete()
+    assert found(client, 'Обновлённый') == [], (
+        'Убедитесь, что поисковый индекс обновляется при изменении и '
+        'удалении постов.'
+    )
+
+
+def test_search_respects_visibility(client, search_posts):
+    search_posts('Скрытый пост', is_published=False)
+    assert found(client, 'Скрытый') == [], (
+        'Убедитесь, что поиск не показывает неопубликованные посты.'
+    )
+
+
+def test_search_handles_syntax_and_pagination(client, search_posts):
+    for i in range(12):
+        search_posts(f'Пост номер {i}')
+    # Служебный синтаксис FTS5 в запросе не ломает поиск
+    assert found(client, 'NEAR( "пост') == []
+    assert len(found(client, 'пост')) == 10
+    assert len(found(client, 'пост', page=2)) == 2
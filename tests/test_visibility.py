@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import signals
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def visible(post):
+    return Post.objects.values_list('is_visible', flat=True).get(pk=post.pk)
+
+
+def test_visibility_follows_post_and_category(
+        post_with_published_location, published_category
+):
+    post = post_with_published_location
+    assert visible(post)
+
+    published_category.is_published = False
+    published_category.save()
+    assert not visible(post), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert visible(post)
+
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    assert not visible(post), (
+        'Убедитесь, что update() по постам пересчитывает is_visible.'
+    )
+
+
+def test_category_edit_without_publish_flip_skips_recompute(
+        monkeypatch, post_with_published_location, published_category
+):
+    calls = []
+    monkeypatch.setattr(
+        signals, 'recompute_in_batches', lambda *args: calls.append(args)
+    )
+    published_category.description = 'Новое описание'
+    published_category.save()
+    assert not calls, (
+        'Убедитесь, что правка категории без смены is_published не '
+        'пересчитывает видимость её постов.'
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert len(calls) == 1
+
+
+def test_feed_filters_on_visibility_flag_only():
+    where = str(Post.objects.main_filter().query).split(' WHERE ')[1]
+    assert '"blog_category"' not in where, (
+        'Убедитесь, что лента фильтрует посты без условия на категорию.'
+    )
+    assert '"blog_post"."is_visible"' in where
+
+
+def test_admin_category_action_hides_posts(
+        admin_client, post_with_published_location, published_category
+):
+    admin_client.post('/admin/blog/category/', {
+        'action': 'off_published',
+        '_selected_action': [published_category.pk],
+    })
+    assert not visible(post_with_published_location)
+
+
+def test_scheduled_post_published_by_scheduler(
+        mixer, user, published_category, monkeypatch
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1)
+    )
+    assert not visible(post)
+    later = timezone.now() + timedelta(hours=2)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+    call_command('publish_scheduled')
+    assert visible(post), (
+        'Убедитесь, что планировщик открывает отложенные посты.'
+    )
+
+
+def test_recompute_visibility_command(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    call_command('recompute_visibility', batch_size=1)
+    assert visible(post)